@@ -1,22 +1,61 @@
 import bpy
 from bpy import context
+import functools
+import logging
+import os
+import sys
+import time
 import numpy as np
 import builtins as __builtin__
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from animutils import write_keyframes
+
 npa = np.ndarray
 
-def console_print(*args) -> None:
-    for a in context.screen.areas:
-        if a.type == 'CONSOLE':
-            c = {'area': a, 'space_data': a.spaces.active, 'region': a.regions[-1], 'window': context.window,
-                 'screen': context.screen}
-            s = " ".join([str(arg) for arg in args])
-            for line in s.split("\n"):
-                bpy.ops.console.scrollback_append(c, text=line)
+class ConsoleLogHandler(logging.Handler):
+    def __init__(self, flush_interval: float = 0.1):
+        super().__init__()
+        self.flush_interval = flush_interval
+        self.lines = []
+        self.line_count = 0
+        self.logging_time = 0.0
+        self.timer_registered = False
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if bpy.app.background:
+            return
+        lines = self.format(record).split("\n")
+        self.lines.extend(lines)
+        self.line_count += len(lines)
+        if not self.timer_registered:
+            bpy.app.timers.register(self.flush_to_console, first_interval=self.flush_interval)
+            self.timer_registered = True
+
+    def flush_to_console(self) -> None:
+        start_time = time.perf_counter()
+        self.timer_registered = False
+        lines, self.lines = self.lines, []
+        for window in context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'CONSOLE':
+                    with context.temp_override(window=window, area=area, region=area.regions[-1]):
+                        for line in lines:
+                            bpy.ops.console.scrollback_append(text=line)
+        self.logging_time += time.perf_counter() - start_time
+
+console_log_handler = ConsoleLogHandler()
+logger = logging.getLogger("3danim")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+logger.handlers.clear()
+logger.addHandler(console_log_handler)
 
 def print(*args, **kwargs):
-    console_print(*args)  # to py consoles
+    start_time = time.perf_counter()
+    logger.info(" ".join([str(arg) for arg in args]))  # to py consoles, batched per redraw
     __builtin__.print(*args, **kwargs)  # to system console
+    console_log_handler.logging_time += time.perf_counter() - start_time
 
 class ColumnVector(npa):
     def __init__(self, x: float, y: float, z: float):
@@ -37,6 +76,53 @@ class ColumnVector(npa):
         return self @ other
 
 
+def translation_matrix(c_vector: ColumnVector) -> npa:
+    matrix = np.identity(4)
+    matrix[0][3] = c_vector[0]
+    matrix[1][3] = c_vector[1]
+    matrix[2][3] = c_vector[2]
+    return matrix
+
+def scaling_matrix(c_vector: ColumnVector) -> npa:
+    matrix = np.identity(4)
+    matrix[0][0] = c_vector[0]
+    matrix[1][1] = c_vector[1]
+    matrix[2][2] = c_vector[2]
+    return matrix
+
+@functools.lru_cache(maxsize=None)
+def rotation_x_matrix(angle: float) -> npa:
+    angle = np.radians(angle)
+    matrix = np.identity(4)
+    matrix[1][1] = np.cos(angle)
+    matrix[1][2] = -np.sin(angle)
+    matrix[2][1] = np.sin(angle)
+    matrix[2][2] = np.cos(angle)
+    matrix.flags.writeable = False
+    return matrix
+
+@functools.lru_cache(maxsize=None)
+def rotation_y_matrix(angle: float) -> npa:
+    angle = np.radians(angle)
+    matrix = np.identity(4)
+    matrix[0][0] = np.cos(angle)
+    matrix[0][2] = np.sin(angle)
+    matrix[2][0] = -np.sin(angle)
+    matrix[2][2] = np.cos(angle)
+    matrix.flags.writeable = False
+    return matrix
+
+@functools.lru_cache(maxsize=None)
+def rotation_z_matrix(angle: float) -> npa:
+    angle = np.radians(angle)
+    matrix = np.identity(4)
+    matrix[0][0] = np.cos(angle)
+    matrix[0][1] = -np.sin(angle)
+    matrix[1][0] = np.sin(angle)
+    matrix[1][1] = np.cos(angle)
+    matrix.flags.writeable = False
+    return matrix
+
 class ThreeDObject:
     def __init__(self, three_d_object_name: str = None):
         self.ref = None
@@ -105,50 +191,105 @@ class Point(ColumnVector, ThreeDObject):
         return 0 if np.isnan(angle) else angle
 
     def translation(self, c_vector: ColumnVector):
-        translation_matrix = np.identity(4)
-        translation_matrix[0][3] = c_vector[0]
-        translation_matrix[1][3] = c_vector[1]
-        translation_matrix[2][3] = c_vector[2]
-        final_matrix = translation_matrix @ np.array(self)
-        self.update(final_matrix)
+        self.update(translation_matrix(c_vector) @ np.array(self))
+
+    def scaling(self, c_vector: ColumnVector):
+        self.update(scaling_matrix(c_vector) @ np.array(self))
+
+    def rotation_x(self, angle: float):
+        self.update(rotation_x_matrix(angle) @ np.array(self))
+
+    def rotation_y(self, angle: float):
+        self.update(rotation_y_matrix(angle) @ np.array(self))
+
+    def rotation_z(self, angle: float):
+        self.update(rotation_z_matrix(angle) @ np.array(self))
+
+class PointCloud(ThreeDObject):
+    def __init__(self, coords, three_d_object_name: str = None, point_names: list[str] = None, _type="PLAIN_AXES", radius=.25, bake: bool = False):
+        super().__init__(three_d_object_name)
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+        self.points = np.ones((len(coords), 4))
+        self.points[:, :3] = coords
+        self.point_names = point_names if point_names else [f"{self.three_d_object_name}.{i}" for i in range(len(coords))]
+        self.type = _type
+        self.radius = radius
+        self.bake = bake
+        self.baked_frames = []
+        self.baked_locations = []
+
+    def __len__(self):
+        return len(self.points)
+
+    def __str__(self):
+        return f"PointCloud<\"{self.three_d_object_name}\">({len(self)} points)"
+
+    def place(self):
+        self.ref = bpy.data.collections.new(self.three_d_object_name)
+        bpy.context.scene.collection.children.link(self.ref)
+        for name, location in zip(self.point_names, self.points[:, :-1]):
+            empty = bpy.data.objects.new(name, None)
+            empty.empty_display_type = self.type
+            empty.empty_display_size = self.radius
+            empty.location = location
+            empty.show_name = True
+            self.ref.objects.link(empty)
+
+    def sync(self):
+        if self.ref:
+            self.ref.objects.foreach_set("location", self.points[:, :-1].ravel())
+
+    def keyframe_insert(self, frame: int, _property: str = "location"):
+        if self.bake and _property == "location":
+            self.baked_frames.append(np.array([frame]))
+            self.baked_locations.append(self.points[np.newaxis, :, :-1].copy())
+            return
+        for empty in self.ref.objects:
+            empty.keyframe_insert(data_path=_property, frame=frame, index=-1)
+
+    def transform(self, *matrices: npa):
+        composed_matrix = np.identity(4)
+        for matrix in matrices:
+            composed_matrix = matrix @ composed_matrix
+        self.points = self.points @ composed_matrix.T
+        if not self.bake:
+            self.sync()
+
+    def bake_transform_steps(self, start_frame: int, matrix: npa, steps: int):
+        step_matrices = np.empty((steps, 4, 4))
+        current_matrix = np.identity(4)
+        for step in range(steps):
+            step_matrices[step] = current_matrix
+            current_matrix = matrix @ current_matrix
+        self.baked_frames.append(start_frame + np.arange(steps))
+        self.baked_locations.append(np.einsum("sij,nj->sni", step_matrices, self.points)[:, :, :-1])
+        self.points = self.points @ current_matrix.T
+
+    def write_baked_keyframes(self):
+        frames = np.concatenate(self.baked_frames)
+        locations = np.concatenate(self.baked_locations)
+        order = np.argsort(frames, kind="stable")
+        frames, locations = frames[order], locations[order]
+        for index, empty in enumerate(self.ref.objects):
+            write_keyframes(empty, "location", frames, locations[:, index, :])
+        self.baked_frames.clear()
+        self.baked_locations.clear()
+        self.sync()
+
+    def translation(self, c_vector: ColumnVector):
+        self.transform(translation_matrix(c_vector))
 
     def scaling(self, c_vector: ColumnVector):
-        homothety_matrix = np.identity(4)
-        homothety_matrix[0][0] = c_vector[0]
-        homothety_matrix[1][1] = c_vector[1]
-        homothety_matrix[2][2] = c_vector[2]
-        final_matrix = homothety_matrix @ np.array(self)
-        self.update(final_matrix)
+        self.transform(scaling_matrix(c_vector))
 
     def rotation_x(self, angle: float):
-        angle = np.radians(angle)
-        rotation_matrix = np.identity(4)
-        rotation_matrix[1][1] = np.cos(angle)
-        rotation_matrix[1][2] = -np.sin(angle)
-        rotation_matrix[2][1] = np.sin(angle)
-        rotation_matrix[2][2] = np.cos(angle)
-        final_matrix = rotation_matrix @ np.array(self)
-        self.update(final_matrix)
+        self.transform(rotation_x_matrix(angle))
 
     def rotation_y(self, angle: float):
-        angle = np.radians(angle)
-        rotation_matrix = np.identity(4)
-        rotation_matrix[0][0] = np.cos(angle)
-        rotation_matrix[0][2] = np.sin(angle)
-        rotation_matrix[2][0] = -np.sin(angle)
-        rotation_matrix[2][2] = np.cos(angle)
-        final_matrix = rotation_matrix @ np.array(self)
-        self.update(final_matrix)
+        self.transform(rotation_y_matrix(angle))
 
     def rotation_z(self, angle: float):
-        angle = np.radians(angle)
-        rotation_matrix = np.identity(4)
-        rotation_matrix[0][0] = np.cos(angle)
-        rotation_matrix[0][1] = -np.sin(angle)
-        rotation_matrix[1][0] = np.sin(angle)
-        rotation_matrix[1][1] = np.cos(angle)
-        final_matrix = rotation_matrix @ np.array(self)
-        self.update(final_matrix)
+        self.transform(rotation_z_matrix(angle))
 
 def determine_common_axis(_point_1: Point, _point_2: Point, _point_3: Point) -> str:
     if _point_1[0] == _point_2[0] == _point_3[0]:
@@ -222,25 +363,40 @@ ANIM_1_END = ANIMATION_FRAMES + PADDING_FRAMES
 ANIM_2_START = ANIM_1_END + PADDING_FRAMES
 ANIM_2_END = ANIM_2_START + Z_ANGLE // DEGREES_PER_SECOND * DESIRED_FPS
 TOTAL_FRAMES = ANIM_2_END + PADDING_FRAMES
+# BAKE_ANIMATION=0 keyframes each rotation step through the live objects instead of baking it in numpy
+BAKE_ANIMATION = os.environ.get("BAKE_ANIMATION", "1") != "0"
 bpy.ops.object.select_all(action='SELECT')
 bpy.ops.object.delete(use_global=False)
-points = [
-    Point(0, 0, 0, "p_1"),
-    Point(1, 0, 0, "p_2"),
-    Point(0, 1, 0, "p_3"),
-    Point(1, 1, 0, "p_4"),
-    Point(0, 0, 1, "p_5"),
-    Point(1, 0, 1, "p_6"),
-    Point(0, 1, 1, "p_7"),
-    Point(1, 1, 1, "p_8")
-]
+point_cloud = PointCloud(
+    [
+        (0, 0, 0),
+        (1, 0, 0),
+        (0, 1, 0),
+        (1, 1, 0),
+        (0, 0, 1),
+        (1, 0, 1),
+        (0, 1, 1),
+        (1, 1, 1),
+    ],
+    three_d_object_name="cube_points",
+    point_names=[f"p_{i}" for i in range(1, 9)],
+    bake=BAKE_ANIMATION,
+)
 ANIM_FRAMES = ANGLE_ANIMATION_FRAMES + 1
-for point in points:
-    point.place()
-    point.keyframe_insert(PADDING_FRAMES)
-    point.translation(ColumnVector(0, 0, 2))
-    point.keyframe_insert(ANIM_1_END)
+point_cloud.place()
+point_cloud.keyframe_insert(PADDING_FRAMES)
+point_cloud.translation(ColumnVector(0, 0, 2))
+point_cloud.keyframe_insert(ANIM_1_END)
+if BAKE_ANIMATION:
+    point_cloud.bake_transform_steps(
+        ANIM_2_START + 1,
+        rotation_z_matrix(Z_ANGLE / ANGLE_ANIMATION_FRAMES),
+        ANGLE_ANIMATION_FRAMES,
+    )
+    point_cloud.write_baked_keyframes()
+else:
     for i in range(1, ANGLE_ANIMATION_FRAMES + 1):
-        point.keyframe_insert(ANIM_2_START + i)
-        point.rotation_z(Z_ANGLE / ANGLE_ANIMATION_FRAMES)
+        point_cloud.keyframe_insert(ANIM_2_START + i)
+        point_cloud.rotation_z(Z_ANGLE / ANGLE_ANIMATION_FRAMES)
 bpy.context.scene.frame_end = TOTAL_FRAMES
+__builtin__.print(f"logging: {console_log_handler.line_count} console lines, {console_log_handler.logging_time:.4f}s")
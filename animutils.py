@@ -0,0 +1,64 @@
+import bpy
+import numpy as np
+
+
+def get_or_create_action(id_data):
+    animation_data = id_data.animation_data
+    if animation_data is None:
+        animation_data = id_data.animation_data_create()
+    if animation_data.action is None:
+        animation_data.action = bpy.data.actions.new(name=f"{id_data.name}Action")
+    return animation_data.action
+
+
+def add_fcurve_cycles_modifier(fcurve, mode_before="REPEAT", mode_after="REPEAT"):
+    modifier = fcurve.modifiers.new(type="CYCLES")
+    modifier.mode_before = mode_before
+    modifier.mode_after = mode_after
+    return modifier
+
+
+def write_fcurve(action, data_path, index, frames, values, interpolation=None, extrapolation=None, cycles=False):
+    fcurve = action.fcurves.find(data_path, index=index)
+    if fcurve is not None:
+        existing_co = np.empty(len(fcurve.keyframe_points) * 2, dtype=np.float32)
+        fcurve.keyframe_points.foreach_get("co", existing_co)
+        keyed = dict(existing_co.reshape(-1, 2).tolist())
+        keyed.update(zip(frames.tolist(), values.tolist()))
+        frames = np.array(sorted(keyed), dtype=np.float32)
+        values = np.array([keyed[frame] for frame in frames.tolist()], dtype=np.float32)
+        action.fcurves.remove(fcurve)
+    fcurve = action.fcurves.new(data_path, index=index)
+    fcurve.keyframe_points.add(len(frames))
+    co = np.empty(len(frames) * 2, dtype=np.float32)
+    co[0::2] = frames
+    co[1::2] = values
+    fcurve.keyframe_points.foreach_set("co", co)
+    if interpolation is not None:
+        for keyframe_point in fcurve.keyframe_points:
+            keyframe_point.interpolation = interpolation
+    if extrapolation is not None:
+        fcurve.extrapolation = extrapolation
+    if cycles:
+        add_fcurve_cycles_modifier(fcurve)
+    fcurve.update()
+    return fcurve
+
+
+def write_keyframes(target, data_path, frames, values, index=None, interpolation=None, extrapolation=None, cycles=False):
+    id_data = target.id_data
+    if target == id_data:
+        full_data_path = data_path
+    else:
+        full_data_path = target.path_from_id(data_path)
+    action = get_or_create_action(id_data)
+    frames = np.asarray(frames, dtype=np.float32)
+    values = np.asarray(values, dtype=np.float32)
+    if values.ndim == 1:
+        channels = [(0 if index is None else index, values)]
+    else:
+        channels = list(enumerate(values.T))
+    return [
+        write_fcurve(action, full_data_path, channel_index, frames, channel_values, interpolation, extrapolation, cycles)
+        for channel_index, channel_values in channels
+    ]
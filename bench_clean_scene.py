@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+import bpy
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from holder import clean_scene
+from sceneutils import clean_scene_fast
+
+OBJECT_COUNTS = (1_000, 10_000, 50_000)
+
+
+def populate_scene(object_count):
+    collection = bpy.data.collections.new("bench.objects")
+    bpy.context.scene.collection.children.link(collection)
+    material = bpy.data.materials.new("bench.material")
+    for i in range(object_count):
+        mesh = bpy.data.meshes.new(f"bench.mesh.{i}")
+        mesh.from_pydata([(0, 0, 0), (1, 0, 0), (0, 1, 0)], [], [(0, 1, 2)])
+        mesh.materials.append(material)
+        obj = bpy.data.objects.new(f"bench.object.{i}", mesh)
+        obj.location = (i % 100, i // 100, 0)
+        obj.keyframe_insert("location", frame=1)
+        collection.objects.link(obj)
+
+
+def time_clean(clean_func, object_count):
+    populate_scene(object_count)
+    start_time = time.perf_counter()
+    clean_func()
+    return time.perf_counter() - start_time
+
+
+def main():
+    print(f"{'objects':>8} {'operators (s)':>14} {'batch_remove (s)':>17} {'speedup':>8}")
+    for object_count in OBJECT_COUNTS:
+        operator_time = time_clean(clean_scene, object_count)
+        batch_remove_time = time_clean(clean_scene_fast, object_count)
+        speedup = operator_time / batch_remove_time
+        print(f"{object_count:>8} {operator_time:>14.3f} {batch_remove_time:>17.3f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
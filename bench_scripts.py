@@ -0,0 +1,158 @@
+import argparse
+import importlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import bpy
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# blender --background --python bench_scripts.py -- [--scripts holder floret] [--seed 1] [--output /tmp/bench_results.json]
+SCRIPT_NAMES = (
+    "holder",
+    "truchet_tiles",
+    "floret",
+    "loopofrings",
+    "hexdelay",
+    "stackoverflow",
+    "inorout",
+    "shapeshiftingloop",
+    "shapeshiftingrefactor",
+    "weave",
+)
+PHASE_FUNCTIONS = {
+    "scene_setup": ("scene_setup", "setup_scene"),
+    "create_centerpiece": ("create_centerpiece",),
+    "lights": ("add_lights", "add_light", "set_up_world_sun_light"),
+}
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Time scene construction and a short render for each generator script")
+    parser.add_argument("--scripts", nargs="+", default=SCRIPT_NAMES)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--samples", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=2)
+    parser.add_argument("--output", default=os.path.join(tempfile.gettempdir(), "bench_results.json"))
+    return parser.parse_args(argv)
+
+
+def get_git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timed(func, timings, phase):
+    def wrapper(*args, **kwargs):
+        start_time = time.perf_counter()
+        result = func(*args, **kwargs)
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start_time
+        return result
+
+    return wrapper
+
+
+def fixed_seed(seed):
+    def time_seed():
+        # same contract as the scripts' time_seed, minus the clock and the clipboard
+        print(f"seed: {seed}")
+        random.seed(seed)
+        return seed
+
+    return time_seed
+
+
+def instrument(module, timings, seed):
+    module.time_seed = fixed_seed(seed)
+    for phase, function_names in PHASE_FUNCTIONS.items():
+        for function_name in function_names:
+            if hasattr(module, function_name):
+                setattr(module, function_name, timed(getattr(module, function_name), timings, phase))
+
+
+def render_short(samples, frames, output_dir):
+    scene = bpy.context.scene
+    if scene.render.engine == "CYCLES":
+        scene.cycles.samples = samples
+    else:
+        scene.eevee.taa_render_samples = samples
+    scene.frame_end = scene.frame_start + frames - 1
+    scene.render.image_settings.file_format = "PNG"
+    scene.render.filepath = os.path.join(output_dir, "")
+    start_time = time.perf_counter()
+    bpy.ops.render.render(animation=True)
+    return time.perf_counter() - start_time
+
+
+def bench_script(script_name, args, output_dir):
+    timings = {}
+    module = importlib.import_module(script_name)
+    instrument(module, timings, args.seed)
+    start_time = time.perf_counter()
+    module.main()
+    timings["build_total"] = time.perf_counter() - start_time
+    timings["build_other"] = timings["build_total"] - sum(timings.get(phase, 0.0) for phase in PHASE_FUNCTIONS)
+    timings["render"] = render_short(args.samples, args.frames, os.path.join(output_dir, script_name))
+    timings["objects"] = len(bpy.data.objects)
+    timings["engine"] = bpy.context.scene.render.engine
+    return timings
+
+
+def main():
+    args = parse_args()
+    # a reopened scene cache would skip the build phase being measured
+    os.environ["SCENE_CACHE"] = "0"
+    results = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        for script_name in args.scripts:
+            print(f"benchmarking {script_name}")
+            try:
+                results[script_name] = bench_script(script_name, args, output_dir)
+            except Exception as error:
+                results[script_name] = {"error": repr(error)}
+            print(f"{script_name}: {results[script_name]}")
+
+    run = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": get_git_revision(),
+        "blender": bpy.app.version_string,
+        "seed": args.seed,
+        "samples": args.samples,
+        "frames": args.frames,
+        "results": results,
+    }
+    runs = []
+    if os.path.exists(args.output):
+        with open(args.output) as results_file:
+            runs = json.load(results_file)
+    runs.append(run)
+    with open(args.output, "w") as results_file:
+        json.dump(runs, results_file, indent=2)
+
+    print(f"{'script':>22} {'setup (s)':>10} {'centerpiece (s)':>16} {'lights (s)':>11} {'build (s)':>10} {'render (s)':>11}")
+    for script_name, timings in results.items():
+        if "error" in timings:
+            print(f"{script_name:>22} {timings['error']}")
+            continue
+        print(
+            f"{script_name:>22} {timings.get('scene_setup', 0.0):>10.3f} {timings.get('create_centerpiece', 0.0):>16.3f} "
+            f"{timings.get('lights', 0.0):>11.3f} {timings['build_total']:>10.3f} {timings['render']:>11.3f}"
+        )
+    print(f"results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -42,7 +42,9 @@ def time_seed():
     seed = time.time()
     print(f"seed: {seed}")
     random.seed(seed)
-    bpy.context.window_manager.clipboard = str(seed)
+    bpy.context.scene["seed"] = seed
+    if not bpy.app.background:
+        bpy.context.window_manager.clipboard = str(seed)
     return seed
 
 def add_ctrl_empty(name=None):
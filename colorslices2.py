@@ -3,7 +3,13 @@ import time
 import math
 
 import bpy
-import mathutils
+import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from primitives import add_object, build_circle_geometry, mesh_from_arrays
+from sceneutils import register_frame_change_handler, unregister_frame_change_handlers
 
 def purge_orphans():
     if bpy.app.version >= (3, 0, 0):
@@ -16,6 +22,7 @@ def purge_orphans():
 def clean_scene():
     if bpy.context.active_object and bpy.context.active_object.mode == "EDIT":
         bpy.ops.object.editmode_toggle()
+    unregister_frame_change_handlers()
     for obj in bpy.data.objects:
         obj.hide_set(False)
         obj.hide_select = False
@@ -42,7 +49,9 @@ def time_seed():
     seed = time.time()
     print(f"seed: {seed}")
     random.seed(seed)
-    bpy.context.window_manager.clipboard = str(seed)
+    bpy.context.scene["seed"] = seed
+    if not bpy.app.background:
+        bpy.context.window_manager.clipboard = str(seed)
     return seed
 
 def add_ctrl_empty(name=None):
@@ -148,20 +157,88 @@ def setup_scene():
     context["colors"] = get_color_palette()
     return context
 
-def gen_perlin_curve():
-    bpy.ops.mesh.primitive_circle_add(vertices=512, radius=1)
-    circle = active_object()
-    deform_coords = []
-
-    for vert in circle.data.vertices:
-        new_location = vert.co
-        noise_value = mathutils.noise.noise(new_location)
-        noise_value = noise_value / 2
-        deform_vector = vert.co * noise_value
-        deform_coord = vert.co + deform_vector
-        deform_coords.append(deform_coord)
+GRADIENTS = np.array(
+    [(1, 1, 0), (-1, 1, 0), (1, -1, 0), (-1, -1, 0),
+     (1, 0, 1), (-1, 0, 1), (1, 0, -1), (-1, 0, -1),
+     (0, 1, 1), (0, -1, 1), (0, 1, -1), (0, -1, -1),
+     (1, 1, 0), (0, -1, 1), (-1, 1, 0), (0, -1, -1)],
+    dtype=np.float32,
+)
+
+def get_permutation(seed=0):
+    permutation = np.random.default_rng(seed).permutation(256)
+    return np.concatenate([permutation, permutation])
+
+def perlin_noise(points, permutation):
+    # improved perlin gradient noise for every row of points at once, roughly in -1..1 like mathutils.noise.noise
+    cells = np.floor(points).astype(np.int64)
+    local = points - cells
+    cells &= 255
+    fade = local * local * local * (local * (local * 6 - 15) + 10)
+    result = np.zeros(len(points), dtype=np.float32)
+    for corner in np.ndindex(2, 2, 2):
+        corner = np.array(corner)
+        hashed = permutation[permutation[permutation[cells[:, 0] + corner[0]] + cells[:, 1] + corner[1]] + cells[:, 2] + corner[2]]
+        gradient_dot = np.einsum("ij,ij->i", GRADIENTS[hashed & 15], local - corner)
+        weight = np.prod(np.where(corner, fade, 1 - fade), axis=1)
+        result += weight * gradient_dot
+    return result
+
+def get_vertex_coords(mesh):
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    return coords.reshape(-1, 3)
+
+def set_vertex_coords(mesh, coords):
+    mesh.vertices.foreach_set("co", coords.ravel())
+    mesh.update()
+
+def deform_with_noise(base_coords, permutation, offset=(0, 0, 0), strength=0.5):
+    # push every vertex away from the slice center by its noise value, slice heights stay put
+    noise_values = perlin_noise(base_coords + np.asarray(offset, dtype=np.float32), permutation) * strength
+    deformed_coords = base_coords.copy()
+    deformed_coords[:, :2] += base_coords[:, :2] * noise_values[:, np.newaxis]
+    return deformed_coords
+
+def build_slice_stack_geometry(slice_count, vertices, radius, slice_spacing):
+    circle_coords, _, circle_edges = build_circle_geometry(vertices, radius)
+    offsets = np.zeros((slice_count, 1, 3))
+    offsets[:, 0, 2] = np.arange(slice_count) * slice_spacing
+    coords = (np.asarray(circle_coords)[np.newaxis, :, :] + offsets).reshape(-1, 3)
+    edges = (np.asarray(circle_edges)[np.newaxis, :, :] + (np.arange(slice_count) * vertices)[:, np.newaxis, np.newaxis]).reshape(-1, 2)
+    return coords, edges
+
+class NoiseSliceAnimator:
+    def __init__(self, mesh, base_coords, permutation, speed=0.02):
+        self.mesh = mesh
+        self.base_coords = base_coords
+        self.permutation = permutation
+        self.speed = speed
+
+    def update(self, scene, depsgraph=None):
+        offset = (0, 0, scene.frame_current * self.speed)
+        set_vertex_coords(self.mesh, deform_with_noise(self.base_coords, self.permutation, offset))
+
+    def register(self):
+        # the handler rewrites mesh data, renders must not read it at the same time
+        bpy.context.scene.render.use_lock_interface = True
+        register_frame_change_handler("colorslices2.noise_slice_animator", self.update)
+        self.update(bpy.context.scene)
+
+def gen_perlin_curve(slice_count=1, slice_spacing=0.05, animate=False):
+    coords, edges = build_slice_stack_geometry(slice_count, 512, 1, slice_spacing)
+    mesh = mesh_from_arrays("perlin_slices", coords, edges=edges)
+    obj = add_object("perlin_slices", mesh)
+    make_active(obj)
+    base_coords = get_vertex_coords(mesh)
+    permutation = get_permutation(random.getrandbits(32))
+    if animate:
+        # animated variants keep the mesh so every frame is one foreach_set over all slices
+        NoiseSliceAnimator(mesh, base_coords, permutation).register()
+        return obj
+    set_vertex_coords(mesh, deform_with_noise(base_coords, permutation))
     bpy.ops.object.convert(target="CURVE")
-    curve_obj = active_object()
+    return active_object()
 
 def main():
     context = setup_scene()
@@ -0,0 +1,50 @@
+import functools
+import math
+import random
+import numpy as np
+
+
+def convert_srgb_to_linear_rgb(srgb_color_component):
+    if srgb_color_component <= 0.04045:
+        linear_color_component = srgb_color_component / 12.92
+    else:
+        linear_color_component = math.pow((srgb_color_component + 0.055) / 1.055, 2.4)
+    return linear_color_component
+
+
+SRGB_TO_LINEAR_LUT = tuple(convert_srgb_to_linear_rgb(value / 255) for value in range(256))
+SRGB_TO_LINEAR_LUT_ARRAY = np.array(SRGB_TO_LINEAR_LUT, dtype=np.float32)
+
+
+def strip_hex_color(hex_color):
+    if hex_color.startswith("#"):
+        hex_color = hex_color[1:]
+    assert len(hex_color) == 6, f"RRGGBB is the supported hex color format: {hex_color}"
+    return hex_color
+
+
+@functools.lru_cache(maxsize=1024)
+def hex_color_to_rgb(hex_color):
+    red, green, blue = bytes.fromhex(strip_hex_color(hex_color))
+    return SRGB_TO_LINEAR_LUT[red], SRGB_TO_LINEAR_LUT[green], SRGB_TO_LINEAR_LUT[blue]
+
+
+@functools.lru_cache(maxsize=1024)
+def hex_color_to_rgba(hex_color, alpha=1.0):
+    linear_red, linear_green, linear_blue = hex_color_to_rgb(hex_color)
+    return linear_red, linear_green, linear_blue, alpha
+
+
+def hex_colors_to_rgba_array(hex_colors, alpha=1.0):
+    hex_string = "".join(strip_hex_color(hex_color) for hex_color in hex_colors)
+    srgb_bytes = np.frombuffer(bytes.fromhex(hex_string), dtype=np.uint8).reshape(-1, 3)
+    rgba = np.empty((len(srgb_bytes), 4), dtype=np.float32)
+    rgba[:, :3] = SRGB_TO_LINEAR_LUT_ARRAY[srgb_bytes]
+    rgba[:, 3] = alpha
+    return rgba
+
+
+def get_random_colors_array(color_palette, count, alpha=1.0):
+    palette_rgba = hex_colors_to_rgba_array(color_palette, alpha=alpha)
+    rng = np.random.default_rng(random.getrandbits(64))
+    return palette_rgba[rng.integers(0, len(palette_rgba), size=count)]
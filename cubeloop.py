@@ -1,8 +1,17 @@
+import argparse
 import random
 import time
 import math
 
 import bpy
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from primitives import add_cube, add_plane
+from renderutils import render_loop
+from opprofiler import profile_operators
 
 def purge_orphans():
     if bpy.app.version >= (3, 0, 0):
@@ -40,7 +49,9 @@ def time_seed():
     seed = time.time()
     print(f"seed: {seed}")
     random.seed(seed)
-    bpy.context.window_manager.clipboard = str(seed)
+    bpy.context.scene["seed"] = seed
+    if not bpy.app.background:
+        bpy.context.window_manager.clipboard = str(seed)
     return seed
 
 def add_ctrl_empty(name=None):
@@ -94,15 +105,16 @@ def set_scene_props(fps, loop_seconds):
     scene.view_settings.look = "Very High Contrast"
     set_1k_square_render_res()
 
-def setup_scene(i=0):
+def setup_scene(i=0, seed=0, output_dir=None):
     fps = 30
     loop_seconds = 12
     frame_count = fps * loop_seconds
     project_name = "cube_loops"
+    if output_dir is None:
+        output_dir = f"/tmp/project_{project_name}"
     bpy.context.scene.render.image_settings.file_format = "FFMPEG"
     bpy.context.scene.render.ffmpeg.format = "MPEG4"
-    bpy.context.scene.render.filepath = f"/tmp/project_{project_name}/loop_{i}.mp4"
-    seed = 0
+    bpy.context.scene.render.filepath = os.path.join(output_dir, f"loop_{i}.mp4")
     if seed:
         random.seed(seed)
     else:
@@ -117,8 +129,10 @@ def setup_scene(i=0):
     }
     return context
 
-def make_fcurves_linear():
-    for fc in bpy.context.active_object.animation_data.action.fcurves:
+def make_fcurves_linear(obj=None):
+    if obj is None:
+        obj = active_object()
+    for fc in obj.animation_data.action.fcurves:
         fc.extrapolation = "LINEAR"
 
 def get_random_color():
@@ -162,9 +176,6 @@ def add_lights():
     bpy.context.object.data.angle = math.radians(180)
     bpy.context.object.data.use_shadow = False
 
-def render_loop():
-    bpy.ops.render.render(animation=True)
-
 def animate_object_rotation(context, obj):
     frame = 1
     obj.rotation_euler.x = math.radians(random.uniform(-360, 360))
@@ -181,29 +192,64 @@ def animate_object_rotation(context, obj):
     obj.keyframe_insert("rotation_euler", index=1, frame=frame)
     obj.rotation_euler.z += math.radians(360) * random.choice(rotations)
     obj.keyframe_insert("rotation_euler", index=2, frame=frame)
-    make_fcurves_linear()
+    make_fcurves_linear(obj)
 
 def gen_centerpiece(context):
     for _ in range(3):
-        bpy.ops.mesh.primitive_cube_add(size=random.uniform(1, 3))
-        cube = active_object()
-        bpy.ops.object.modifier_add(type="WIREFRAME")
-        cube.modifiers["Wireframe"].thickness = random.uniform(0.03, 0.1)
+        cube = add_cube(size=random.uniform(1, 3), shared=False)
+        wireframe_modifier = cube.modifiers.new("Wireframe", type="WIREFRAME")
+        wireframe_modifier.thickness = random.uniform(0.03, 0.1)
         animate_object_rotation(context, cube)
         apply_material(cube)
 
 def gen_background():
-    bpy.ops.mesh.primitive_plane_add(size=20, location=(0, 0, -5))
-    obj = active_object()
+    obj = add_plane(size=20, location=(0, 0, -5), shared=False)
     apply_material(obj)
 
+def build_variation(i, seed=0, output_dir=None):
+    context = setup_scene(i, seed, output_dir)
+    add_lights()
+    gen_centerpiece(context)
+    gen_background()
+    return context
+
+def run_variation(i, seed, output_dir):
+    start_time = time.perf_counter()
+    build_variation(i, seed, output_dir)
+    build_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    render_loop()
+    render_time = time.perf_counter() - start_time
+    result = {
+        "variation": i,
+        "seed": seed,
+        "output": bpy.context.scene.render.filepath,
+        "build_time": build_time,
+        "render_time": render_time,
+    }
+    print(f"variation result: {json.dumps(result)}")
+    return result
+
+def parse_worker_args():
+    # blender --background --python cubeloop.py -- --worker <variation> <seed> <output_dir>
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="cubeloop.py")
+    parser.add_argument("--worker", nargs=3, metavar=("VARIATION", "SEED", "OUTPUT_DIR"))
+    args, _ = parser.parse_known_args(argv)
+    if args.worker is None:
+        return None
+    variation, seed, output_dir = args.worker
+    return int(variation), int(seed), output_dir
+
 def main():
-    count = 16
-    for i in range(count):
-        context = setup_scene(i)
-        add_lights()
-        gen_centerpiece(context)
-        gen_background()
+    with profile_operators(globals()):
+        worker_args = parse_worker_args()
+        if worker_args:
+            run_variation(*worker_args)
+            return
+        count = 16
+        for i in range(count):
+            build_variation(i)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cubeloop.py")
+RESULT_PREFIX = "variation result: "
+
+
+def default_worker_count(threads_per_worker):
+    return max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+
+def run_worker(blender, variation, seed, output_dir, threads_per_worker):
+    variation_dir = os.path.join(output_dir, f"variation_{variation}")
+    os.makedirs(variation_dir, exist_ok=True)
+    command = [
+        blender,
+        "--background",
+        "--factory-startup",
+        "--threads",
+        str(threads_per_worker),
+        "--python",
+        SCRIPT_PATH,
+        "--",
+        "--worker",
+        str(variation),
+        str(seed),
+        variation_dir,
+    ]
+    start_time = time.perf_counter()
+    with open(os.path.join(variation_dir, "blender.log"), "w") as log_file:
+        completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        log_file.write(completed.stdout)
+    result = {"variation": variation, "seed": seed, "build_time": None, "render_time": None}
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            result = json.loads(line[len(RESULT_PREFIX):])
+    result["returncode"] = completed.returncode
+    result["wall_time"] = time.perf_counter() - start_time
+    return result
+
+
+def print_summary(results, total_time):
+    print(f"{'variation':>9} {'seed':>12} {'build (s)':>10} {'render (s)':>11} {'wall (s)':>9} {'status':>7}")
+    for result in sorted(results, key=lambda result: result["variation"]):
+        build_time = f"{result['build_time']:.2f}" if result["build_time"] is not None else "-"
+        render_time = f"{result['render_time']:.2f}" if result["render_time"] is not None else "-"
+        status = "ok" if result["returncode"] == 0 else "failed"
+        print(
+            f"{result['variation']:>9} {result['seed']:>12} {build_time:>10} {render_time:>11} "
+            f"{result['wall_time']:>9.2f} {status:>7}"
+        )
+    print(f"total wall time: {total_time:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and render cubeloop.py variations in parallel headless Blender workers")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"))
+    parser.add_argument("--count", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=int(time.time()), help="variation i uses seed + i")
+    parser.add_argument("--threads-per-worker", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output-dir", default="/tmp/project_cube_loops")
+    args = parser.parse_args()
+
+    workers = args.workers or default_worker_count(args.threads_per_worker)
+    print(f"rendering {args.count} variations with {workers} workers, base seed {args.seed}")
+    start_time = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_worker, args.blender, i, args.seed + i, args.output_dir, args.threads_per_worker)
+            for i in range(args.count)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            print(f"variation {result['variation']} finished with return code {result['returncode']}")
+            results.append(result)
+    total_time = time.perf_counter() - start_time
+    print_summary(results, total_time)
+    with open(os.path.join(args.output_dir, "summary.json"), "w") as summary_file:
+        json.dump({"workers": workers, "total_time": total_time, "results": results}, summary_file, indent=2)
+    return 0 if all(result["returncode"] == 0 for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
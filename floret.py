@@ -3,6 +3,15 @@ import time
 import math
 
 import bpy
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from colorutils import hex_color_to_rgba
+from primitives import add_ico_sphere, set_object_material
+from animutils import write_keyframes
+from renderutils import render_loop
+from opprofiler import profile_operators
 
 def purge_orphans():
     if bpy.app.version >= (3, 0, 0):
@@ -38,7 +47,9 @@ def time_seed():
     seed = time.time()
     print(f"seed: {seed}")
     random.seed(seed)
-    bpy.context.window_manager.clipboard = str(seed)
+    bpy.context.scene["seed"] = seed
+    if not bpy.app.background:
+        bpy.context.window_manager.clipboard = str(seed)
     return seed
 
 def add_ctrl_empty(name=None):
@@ -66,36 +77,6 @@ def set_1080px_square_render_res():
     bpy.context.scene.render.resolution_x = 1080
     bpy.context.scene.render.resolution_y = 1080
 
-def set_fcurve_extrapolation_to_linear():
-    for fc in bpy.context.active_object.animation_data.action.fcurves:
-        fc.extrapolation = "LINEAR"
-
-def hex_color_to_rgb(hex_color):
-    if hex_color.startswith("#"):
-        hex_color = hex_color[1:]
-    assert len(hex_color) == 6, f"RRGGBB is the supported hex color format: {hex_color}"
-    red = int(hex_color[:2], 16)
-    srgb_red = red / 255
-    linear_red = convert_srgb_to_linear_rgb(srgb_red)
-    green = int(hex_color[2:4], 16)
-    srgb_green = green / 255
-    linear_green = convert_srgb_to_linear_rgb(srgb_green)
-    blue = int(hex_color[4:6], 16)
-    srgb_blue = blue / 255
-    linear_blue = convert_srgb_to_linear_rgb(srgb_blue)
-    return tuple([linear_red, linear_green, linear_blue])
-
-def hex_color_to_rgba(hex_color, alpha=1.0):
-    linear_red, linear_green, linear_blue = hex_color_to_rgb(hex_color)
-    return tuple([linear_red, linear_green, linear_blue, alpha])
-
-def convert_srgb_to_linear_rgb(srgb_color_component):
-    if srgb_color_component <= 0.04045:
-        linear_color_component = srgb_color_component / 12.92
-    else:
-        linear_color_component = math.pow((srgb_color_component + 0.055) / 1.055, 2.4)
-    return linear_color_component
-
 def create_emission_material(color, name=None, energy=30, return_nodes=False):
     if name is None:
         name = ""
@@ -114,10 +95,6 @@ def create_emission_material(color, name=None, energy=30, return_nodes=False):
     else:
         return material
 
-def render_loop():
-    bpy.ops.render.render(animation=True)
-
-
 def get_random_color():
     hex_color = random.choice(
         [
@@ -190,15 +167,15 @@ def scene_setup(i=0):
 
 def create_data_animation_loop(obj, data_path, start_value, mid_value, start_frame, loop_length, linear_extrapolation=True):
     setattr(obj, data_path, start_value)
-    obj.keyframe_insert(data_path, frame=start_frame)
-    setattr(obj, data_path, mid_value)
     mid_frame = start_frame + (loop_length) / 2
-    obj.keyframe_insert(data_path, frame=mid_frame)
-    setattr(obj, data_path, start_value)
     end_frame = start_frame + loop_length
-    obj.keyframe_insert(data_path, frame=end_frame)
-    if linear_extrapolation:
-        set_fcurve_extrapolation_to_linear()
+    write_keyframes(
+        obj,
+        data_path,
+        frames=(start_frame, mid_frame, end_frame),
+        values=(start_value, mid_value, start_value),
+        extrapolation="LINEAR" if linear_extrapolation else None,
+    )
 
 def calculate_end_frame(context, current_frame):
     quotient, remainder = divmod(current_frame, context["fps"])
@@ -243,10 +220,9 @@ def create_centerpiece(context):
     count = 300
     for n in range(count):
         x, y = calculate_phyllotaxis_coordinates(n, angle, scale_fac)
-        bpy.ops.mesh.primitive_ico_sphere_add(radius=ico_sphere_radius, location=(x, y, 0))
-        obj = active_object()
+        obj = add_ico_sphere(radius=ico_sphere_radius, location=(x, y, 0), name=f"Icosphere.{n}")
         material, nodes = create_emission_material(color=random.choice(colors), name=f"{n}_sphr", energy=30, return_nodes=True)
-        obj.data.materials.append(material)
+        set_object_material(obj, material)
         create_data_animation_loop(
             nodes["Emission"].inputs["Strength"],
             "default_value",
@@ -262,8 +238,9 @@ def create_centerpiece(context):
     animate_depth_of_field(end_frame)
 
 def main():
-    context = scene_setup()
-    create_centerpiece(context)
+    with profile_operators(globals()):
+        context = scene_setup()
+        create_centerpiece(context)
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,14 @@ import time
 import math
 
 import bpy
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from colorutils import hex_color_to_rgb, hex_color_to_rgba
+from primitives import add_circle_curve
+from renderutils import render_loop
+from opprofiler import profile_operators
 
 def purge_orphans():
     if bpy.app.version >= (3, 0, 0):
@@ -31,32 +39,6 @@ def clean_scene():
     bpy.context.scene.world = bpy.data.worlds["World"]
     purge_orphans()
 
-def hex_color_to_rgb(hex_color):
-    if hex_color.startswith("#"):
-        hex_color = hex_color[1:]
-    assert len(hex_color) == 6, f"RRGGBB is the supported hex color format: {hex_color}"
-    red = int(hex_color[:2], 16)
-    srgb_red = red / 255
-    linear_red = convert_srgb_to_linear_rgb(srgb_red)
-    green = int(hex_color[2:4], 16)
-    srgb_green = green / 255
-    linear_green = convert_srgb_to_linear_rgb(srgb_green)
-    blue = int(hex_color[4:6], 16)
-    srgb_blue = blue / 255
-    linear_blue = convert_srgb_to_linear_rgb(srgb_blue)
-    return tuple([linear_red, linear_green, linear_blue])
-
-def hex_color_to_rgba(hex_color, alpha=1.0):
-    linear_red, linear_green, linear_blue = hex_color_to_rgb(hex_color)
-    return tuple([linear_red, linear_green, linear_blue, alpha])
-
-def convert_srgb_to_linear_rgb(srgb_color_component):
-    if srgb_color_component <= 0.04045:
-        linear_color_component = srgb_color_component / 12.92
-    else:
-        linear_color_component = math.pow((srgb_color_component + 0.055) / 1.055, 2.4)
-    return linear_color_component
-
 def active_object():
     return bpy.context.active_object
 
@@ -64,7 +46,9 @@ def time_seed():
     seed = time.time()
     print(f"seed: {seed}")
     random.seed(seed)
-    bpy.context.window_manager.clipboard = str(seed)
+    bpy.context.scene["seed"] = seed
+    if not bpy.app.background:
+        bpy.context.window_manager.clipboard = str(seed)
     return seed
 
 def add_ctrl_empty(name=None):
@@ -147,14 +131,13 @@ def scene_setup(i=0):
     }
     return context
 
-def make_fcurves_bounce():
-    for fcurve in bpy.context.active_object.animation_data.action.fcurves:
+def make_fcurves_bounce(obj=None):
+    if obj is None:
+        obj = active_object()
+    for fcurve in obj.animation_data.action.fcurves:
         for kf in fcurve.keyframe_points:
             kf.interpolation = "BOUNCE"
 
-def render_loop():
-    bpy.ops.render.render(animation=True)
-
 def get_random_color():
     hex_color = random.choice(
         [
@@ -244,13 +227,13 @@ def animate_rotation(context, obj, i, frame_offset):
     obj.rotation_euler.y = radians
     end_frame = context["frame_count"] - 10
     obj.keyframe_insert("rotation_euler", frame=end_frame)
-    make_fcurves_bounce()
+    make_fcurves_bounce(obj)
 
 def create_bevel(obj):
-    bpy.ops.object.convert(target="CURVE")
     obj.data.bevel_depth = 0.025
     obj.data.bevel_resolution = 16
-    bpy.ops.object.shade_smooth()
+    for spline in obj.data.splines:
+        spline.use_smooth = True
 
 def create_centerpiece(context):
     radius_step = 0.2
@@ -258,8 +241,7 @@ def create_centerpiece(context):
     frame_offset = 5
     for i in range(1, number_of_shapes):
         current_radius = i * radius_step
-        bpy.ops.mesh.primitive_circle_add(vertices=6, radius=current_radius)
-        shape_obj = active_object()
+        shape_obj = add_circle_curve(vertices=6, radius=current_radius, name=f"Circle.{i}")
         degrees = -90
         radians = math.radians(degrees)
         shape_obj.rotation_euler.x = radians
@@ -268,9 +250,10 @@ def create_centerpiece(context):
         apply_material(shape_obj, context["material"])
 
 def main():
-    context = scene_setup()
-    create_centerpiece(context)
-    add_lights()
+    with profile_operators(globals()):
+        context = scene_setup()
+        create_centerpiece(context)
+        add_lights()
 
 if __name__ == "__main__":
     main()
@@ -2,45 +2,19 @@ import random
 import time
 import pprint
 import math
-import addon_utils
 import mathutils
 import bpy
-
-def purge_orphans():
-    if bpy.app.version >= (3, 0, 0):
-        bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
-    else:
-        result = bpy.ops.outliner.orphans_purge()
-        if result.pop() != "CANCELLED":
-            purge_orphans()
-
-def clean_scene():
-    if bpy.context.active_object and bpy.context.active_object.mode == "EDIT":
-        bpy.ops.object.editmode_toggle()
-    for obj in bpy.data.objects:
-        obj.hide_set(False)
-        obj.hide_select = False
-        obj.hide_viewport = False
-    bpy.ops.object.select_all(action="SELECT")
-    bpy.ops.object.delete()
-    collection_names = [col.name for col in bpy.data.collections]
-    for name in collection_names:
-        bpy.data.collections.remove(bpy.data.collections[name])
-    world_names = [world.name for world in bpy.data.worlds]
-    for name in world_names:
-        bpy.data.worlds.remove(bpy.data.worlds[name])
-    bpy.ops.world.new()
-    bpy.context.scene.world = bpy.data.worlds["World"]
-    purge_orphans()
-
-def clean_scene_experimental():
-    old_scene_name = "to_delete"
-    bpy.context.window.scene.name = old_scene_name
-    bpy.ops.scene.new()
-    bpy.data.scenes.remove(bpy.data.scenes[old_scene_name])
-    bpy.ops.world.new()
-    bpy.context.scene.world = bpy.data.worlds["World"]
-    purge_orphans()
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from colorutils import hex_color_to_rgba
+from sceneutils import clean_scene_fast
+from animutils import write_keyframes
+from opprofiler import profile_operators
+from scenecache import build_scene_manifest, get_requested_seed, load_cached_scene, save_cached_scene
+from renderprofiles import apply_render_profile
+from primitives import add_round_cube
 
 def active_object():
     return bpy.context.active_object
@@ -50,7 +24,9 @@ def time_seed():
     seed = time.time()
     print(f"seed: {seed}")
     random.seed(seed)
-    bpy.context.window_manager.clipboard = str(seed)
+    bpy.context.scene["seed"] = seed
+    if not bpy.app.background:
+        bpy.context.window_manager.clipboard = str(seed)
     return seed
 
 def add_ctrl_empty(name=None):
@@ -78,36 +54,6 @@ def set_1080px_square_render_res():
     bpy.context.scene.render.resolution_x = 1080
     bpy.context.scene.render.resolution_y = 1080
 
-def set_fcurve_extrapolation_to_linear():
-    for fc in bpy.context.active_object.animation_data.action.fcurves:
-        fc.extrapolation = "LINEAR"
-
-def hex_color_to_rgb(hex_color):
-    if hex_color.startswith("#"):
-        hex_color = hex_color[1:]
-    assert len(hex_color) == 6, f"RRGGBB is the supported hex color format: {hex_color}"
-    red = int(hex_color[:2], 16)
-    srgb_red = red / 255
-    linear_red = convert_srgb_to_linear_rgb(srgb_red)
-    green = int(hex_color[2:4], 16)
-    srgb_green = green / 255
-    linear_green = convert_srgb_to_linear_rgb(srgb_green)
-    blue = int(hex_color[4:6], 16)
-    srgb_blue = blue / 255
-    linear_blue = convert_srgb_to_linear_rgb(srgb_blue)
-    return tuple([linear_red, linear_green, linear_blue])
-
-def hex_color_to_rgba(hex_color, alpha=1.0):
-    linear_red, linear_green, linear_blue = hex_color_to_rgb(hex_color)
-    return tuple([linear_red, linear_green, linear_blue, alpha])
-
-def convert_srgb_to_linear_rgb(srgb_color_component):
-    if srgb_color_component <= 0.04045:
-        linear_color_component = srgb_color_component / 12.92
-    else:
-        linear_color_component = math.pow((srgb_color_component + 0.055) / 1.055, 2.4)
-    return linear_color_component
-
 def apply_material(material):
     obj = active_object()
     obj.data.materials.append(material)
@@ -149,35 +95,23 @@ def add_bezier_circle(radius=1.0, bevel_depth=0.0, resolution_u=12, extrude=0):
     bezier_circle_obj.data.extrude = extrude
     return bezier_circle_obj
 
-def add_round_cube(radius=1.0):
-    enable_extra_meshes()
-    bpy.ops.mesh.primitive_round_cube_add(radius=radius)
-    return active_object()
-
 def add_subdivided_round_cube(radius=1.0):
-    round_cube_obj = add_round_cube(radius)
+    round_cube_obj = add_round_cube(radius=radius)
+    make_active(round_cube_obj)
     bpy.ops.object.modifier_add(type="SUBSURF")
     return round_cube_obj, round_cube_obj.modifiers["Subdivision"]
 
 def create_data_animation_loop(obj, data_path, start_value, mid_value, start_frame, loop_length, linear_extrapolation=True):
     setattr(obj, data_path, start_value)
-    obj.keyframe_insert(data_path, frame=start_frame)
-    setattr(obj, data_path, mid_value)
     mid_frame = start_frame + (loop_length) / 2
-    obj.keyframe_insert(data_path, frame=mid_frame)
-    setattr(obj, data_path, start_value)
     end_frame = start_frame + loop_length
-    obj.keyframe_insert(data_path, frame=end_frame)
-    if linear_extrapolation:
-        set_fcurve_extrapolation_to_linear()
-
-def enable_addon(addon_module_name):
-    loaded_default, loaded_state = addon_utils.check(addon_module_name)
-    if not loaded_state:
-        addon_utils.enable(addon_module_name)
-
-def enable_extra_meshes():
-    enable_addon(addon_module_name="add_mesh_extra_objects")
+    write_keyframes(
+        obj,
+        data_path,
+        frames=(start_frame, mid_frame, end_frame),
+        values=(start_value, mid_value, start_value),
+        extrapolation="LINEAR" if linear_extrapolation else None,
+    )
 
 def add_fcruve_cycles_modifier(obj=None):
     if obj is None:
@@ -275,9 +209,7 @@ def set_scene_props(fps, loop_seconds):
     scene.render.fps = fps
     scene.frame_current = 1
     scene.frame_start = 1
-    scene.render.engine = "CYCLES"
-    scene.cycles.device = "GPU"
-    scene.cycles.samples = 300
+    apply_render_profile(scene, samples=300)
     scene.view_settings.look = "Very High Contrast"
     set_1080px_square_render_res()
 
@@ -287,23 +219,22 @@ def scene_setup(i=0):
     frame_count = fps * loop_seconds
     project_name = "holder"
     bpy.context.scene.render.image_settings.file_format = "PNG"
-    seed = 0
+    seed = get_requested_seed()
     if seed:
         random.seed(seed)
     else:
         seed = time_seed()
     bpy.context.scene.render.filepath = f"/tmp/project_{project_name}_{seed}/"
-    use_clean_scene_experimental = False
-    if use_clean_scene_experimental:
-        clean_scene_experimental()
-    else:
-        clean_scene()
+    clean_scene_fast()
     set_scene_props(fps, loop_seconds)
     loc = (0, 0, 3.5)
     rot = (0, 0, 0)
     setup_camera(loc, rot)
     context = {
         "frame_count": frame_count,
+        "fps": fps,
+        "loop_seconds": loop_seconds,
+        "seed": seed,
     }
     return context
 
@@ -466,10 +397,15 @@ def create_centerpiece(context):
     animate_displace_modifier(context)
 
 def main():
-    context = scene_setup()
-    context["color_palette"] = select_random_color_palette()
-    create_centerpiece(context)
-    add_lights(context["color_palette"])
+    with profile_operators(globals()):
+        context = scene_setup()
+        context["color_palette"] = select_random_color_palette()
+        manifest = build_scene_manifest(__file__, context["seed"], context["fps"], context["loop_seconds"], context["color_palette"])
+        if load_cached_scene(manifest):
+            return
+        create_centerpiece(context)
+        add_lights(context["color_palette"])
+        save_cached_scene(manifest)
 
 if __name__ == "__main__":
     main()
@@ -2,42 +2,15 @@ import random
 import time
 import math
 import bpy
+import os
+import sys
 
-def purge_orphans():
-    if bpy.app.version >= (3, 0, 0):
-        bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
-    else:
-        result = bpy.ops.outliner.orphans_purge()
-        if result.pop() != "CANCELLED":
-            purge_orphans()
-
-def clean_scene():
-    if bpy.context.active_object and bpy.context.active_object.mode == "EDIT":
-        bpy.ops.object.editmode_toggle()
-    for obj in bpy.data.objects:
-        obj.hide_set(False)
-        obj.hide_select = False
-        obj.hide_viewport = False
-    bpy.ops.object.select_all(action="SELECT")
-    bpy.ops.object.delete()
-    collection_names = [col.name for col in bpy.data.collections]
-    for name in collection_names:
-        bpy.data.collections.remove(bpy.data.collections[name])
-    world_names = [world.name for world in bpy.data.worlds]
-    for name in world_names:
-        bpy.data.worlds.remove(bpy.data.worlds[name])
-    bpy.ops.world.new()
-    bpy.context.scene.world = bpy.data.worlds["World"]
-    purge_orphans()
-
-def clean_scene_experimental():
-    old_scene_name = "to_delete"
-    bpy.context.window.scene.name = old_scene_name
-    bpy.ops.scene.new()
-    bpy.data.scenes.remove(bpy.data.scenes[old_scene_name])
-    bpy.ops.world.new()
-    bpy.context.scene.world = bpy.data.worlds["World"]
-    purge_orphans()
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from colorutils import hex_color_to_rgba
+from sceneutils import clean_scene_fast
+from renderutils import render_loop
+from opprofiler import profile_operators
+from renderprofiles import apply_render_profile
 
 def active_object():
     return bpy.context.active_object
@@ -46,7 +19,9 @@ def time_seed():
     seed = time.time()
     print(f"seed: {seed}")
     random.seed(seed)
-    bpy.context.window_manager.clipboard = str(seed)
+    bpy.context.scene["seed"] = seed
+    if not bpy.app.background:
+        bpy.context.window_manager.clipboard = str(seed)
     return seed
 
 def add_ctrl_empty(name=None):
@@ -78,32 +53,6 @@ def set_fcurve_extrapolation_to_linear():
     for fc in bpy.context.active_object.animation_data.action.fcurves:
         fc.extrapolation = "LINEAR"
 
-def hex_color_to_rgb(hex_color):
-    if hex_color.startswith("#"):
-        hex_color = hex_color[1:]
-    assert len(hex_color) == 6, f"RRGGBB is the supported hex color format: {hex_color}"
-    red = int(hex_color[:2], 16)
-    srgb_red = red / 255
-    linear_red = convert_srgb_to_linear_rgb(srgb_red)
-    green = int(hex_color[2:4], 16)
-    srgb_green = green / 255
-    linear_green = convert_srgb_to_linear_rgb(srgb_green)
-    blue = int(hex_color[4:6], 16)
-    srgb_blue = blue / 255
-    linear_blue = convert_srgb_to_linear_rgb(srgb_blue)
-    return tuple([linear_red, linear_green, linear_blue])
-
-def hex_color_to_rgba(hex_color, alpha=1.0):
-    linear_red, linear_green, linear_blue = hex_color_to_rgb(hex_color)
-    return tuple([linear_red, linear_green, linear_blue, alpha])
-
-def convert_srgb_to_linear_rgb(srgb_color_component):
-    if srgb_color_component <= 0.04045:
-        linear_color_component = srgb_color_component / 12.92
-    else:
-        linear_color_component = math.pow((srgb_color_component + 0.055) / 1.055, 2.4)
-    return linear_color_component
-
 class Axis:
     X = 0
     Y = 1
@@ -179,9 +128,6 @@ def apply_reflective_material(color, name=None, roughness=0.1, specular=0.5):
     obj = active_object()
     obj.data.materials.append(material)
 
-def render_loop():
-    bpy.ops.render.render(animation=True)
-
 def get_random_color():
     hex_color = random.choice(
         [
@@ -222,9 +168,7 @@ def set_scene_props(fps, loop_seconds):
     scene.render.fps = fps
     scene.frame_current = 1
     scene.frame_start = 1
-    scene.render.engine = "CYCLES"
-    scene.cycles.device = "CPU"
-    scene.cycles.samples = 1024
+    apply_render_profile(scene, samples=1024)
     scene.view_settings.look = "Very High Contrast"
     set_1080px_square_render_res()
 
@@ -241,11 +185,7 @@ def scene_setup(i=0):
         random.seed(seed)
     else:
         time_seed()
-    use_clean_scene_experimental = False
-    if use_clean_scene_experimental:
-        clean_scene_experimental()
-    else:
-        clean_scene()
+    clean_scene_fast()
     set_scene_props(fps, loop_seconds)
     loc = (0, 0, 7)
     rot = (0, 0, 0)
@@ -318,11 +258,12 @@ def create_background():
     apply_emission_material(color, energy=30)
 
 def main():
-    context = scene_setup()
-    create_centerpiece(context)
-    create_background()
-    add_light()
-    apply_glare_composite_effect()
+    with profile_operators(globals()):
+        context = scene_setup()
+        create_centerpiece(context)
+        create_background()
+        add_light()
+        apply_glare_composite_effect()
 
 if __name__ == "__main__":
     main()
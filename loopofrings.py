@@ -3,6 +3,14 @@ import time
 import math
 
 import bpy
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from primitives import add_circle_curve
+from renderutils import render_loop
+from opprofiler import profile_operators
+from renderprofiles import apply_render_profile
 
 def purge_orphans():
     if bpy.app.version >= (3, 0, 0):
@@ -38,7 +46,9 @@ def time_seed():
     seed = time.time()
     print(f"seed: {seed}")
     random.seed(seed)
-    bpy.context.window_manager.clipboard = str(seed)
+    bpy.context.scene["seed"] = seed
+    if not bpy.app.background:
+        bpy.context.window_manager.clipboard = str(seed)
     return seed
 
 def add_ctrl_empty(name=None):
@@ -80,8 +90,10 @@ def set_1080px_square_render_res():
     bpy.context.scene.render.resolution_x = 1080
     bpy.context.scene.render.resolution_y = 1080
 
-def make_fcurves_linear():
-    for fcurve in bpy.context.active_object.animation_data.action.fcurves:
+def make_fcurves_linear(obj=None):
+    if obj is None:
+        obj = active_object()
+    for fcurve in obj.animation_data.action.fcurves:
         for points in fcurve.keyframe_points:
             points.interpolation = "LINEAR"
 
@@ -111,19 +123,12 @@ def get_random_color():
         ]
     )
 
-def render_loop():
-    bpy.ops.render.render(animation=True)
-
 def create_background():
     create_floor()
     create_emissive_ring()
 
 def create_emissive_ring():
-    bpy.ops.mesh.primitive_circle_add(vertices=128, radius=5.5)
-    ring_obj = bpy.context.active_object
-    ring_obj.name = "ring.emissive"
-    ring_obj.rotation_euler.x = math.radians(90)
-    bpy.ops.object.convert(target="CURVE")
+    ring_obj = add_circle_curve(vertices=128, radius=5.5, rotation=(math.radians(90), 0, 0), name="ring.emissive")
     ring_obj.data.bevel_depth = 0.05
     ring_obj.data.bevel_resolution = 16
     ring_material = create_emissive_ring_material()
@@ -177,9 +182,7 @@ def set_scene_props(fps, loop_seconds):
     scene.render.fps = fps
     scene.frame_current = 1
     scene.frame_start = 1
-    scene.render.engine = "CYCLES"
-    scene.cycles.device = "CPU"
-    scene.cycles.samples = 200
+    apply_render_profile(scene, samples=200)
     scene.view_settings.look = "Very High Contrast"
     set_1080px_square_render_res()
 
@@ -223,17 +226,15 @@ def animate_rotation(context, ring_obj, z_rotation, y_rotation):
     ring_obj.rotation_euler.z = radians
     end_frame = context["frame_count"] + 1
     ring_obj.keyframe_insert("rotation_euler", frame=end_frame)
-    make_fcurves_linear()
+    make_fcurves_linear(ring_obj)
 
 def create_ring(index, current_radius, ring_material):
-    bpy.ops.mesh.primitive_circle_add(vertices=128, radius=current_radius)
-    ring_obj = bpy.context.active_object
-    ring_obj.name = f"ring.{index}"
-    bpy.ops.object.convert(target="CURVE")
+    ring_obj = add_circle_curve(vertices=128, radius=current_radius, name=f"ring.{index}")
     ring_obj.data.bevel_depth = 0.05
     ring_obj.data.bevel_resolution = 16
-    bpy.ops.object.shade_smooth()
-    apply_material(ring_material)
+    for spline in ring_obj.data.splines:
+        spline.use_smooth = True
+    ring_obj.data.materials.append(ring_material)
     return ring_obj
 
 def create_centerpiece(context):
@@ -250,10 +251,11 @@ def create_centerpiece(context):
         z_rotation = z_rotation + z_rotation_step
 
 def main():
-    context = setup_scene()
-    create_centerpiece(context)
-    create_background()
-    add_light()
+    with profile_operators(globals()):
+        context = setup_scene()
+        create_centerpiece(context)
+        create_background()
+        add_light()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,89 @@
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import bpy
+
+MESH_CACHE_DIR = os.environ.get("MESH_CACHE_DIR", os.path.join(tempfile.gettempdir(), "blender_mesh_cache"))
+MESH_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def get_builder_code_hash(build_object):
+    # the builder plus every function it reaches through its module globals
+    code_hash = hashlib.sha1()
+    pending_funcs = [build_object]
+    seen_funcs = set()
+    while pending_funcs:
+        # profiled runs reach the opprofiler wrappers through the module globals
+        func = inspect.unwrap(pending_funcs.pop())
+        if func in seen_funcs:
+            continue
+        seen_funcs.add(func)
+        try:
+            code_hash.update(inspect.getsource(func).encode("utf-8"))
+        except (OSError, TypeError):
+            code_hash.update(func.__code__.co_code)
+            code_hash.update(repr(func.__code__.co_consts).encode("utf-8"))
+        for name in func.__code__.co_names:
+            value = func.__globals__.get(name)
+            if inspect.isfunction(value):
+                pending_funcs.append(value)
+    return code_hash.hexdigest()
+
+
+def mesh_cache_key(generator_name, build_object, params):
+    key_source = json.dumps(
+        {
+            "generator": generator_name,
+            "params": params,
+            "code_hash": get_builder_code_hash(build_object),
+            "blender": bpy.app.version_string,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha1(key_source.encode("utf-8")).hexdigest()
+
+
+def evict_mesh_cache(cache_dir, max_bytes):
+    cache_files = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".blend")]
+    cache_files.sort(key=os.path.getmtime)
+    total_bytes = sum(os.path.getsize(path) for path in cache_files)
+    while cache_files and total_bytes > max_bytes:
+        oldest_path = cache_files.pop(0)
+        total_bytes -= os.path.getsize(oldest_path)
+        os.remove(oldest_path)
+
+
+def load_cached_data(cache_path):
+    with bpy.data.libraries.load(cache_path, link=False) as (data_from, data_to):
+        data_to.meshes = data_from.meshes
+        data_to.curves = data_from.curves
+    os.utime(cache_path)
+    return next(data for data in [*data_to.meshes, *data_to.curves] if data is not None)
+
+
+def link_and_activate(obj):
+    bpy.context.collection.objects.link(obj)
+    for selected_obj in bpy.context.selected_objects:
+        selected_obj.select_set(False)
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+
+
+def cached_object(generator_name, build_object, params, cache_dir=MESH_CACHE_DIR, max_bytes=MESH_CACHE_MAX_BYTES):
+    os.makedirs(cache_dir, exist_ok=True)
+    key = mesh_cache_key(generator_name, build_object, params)
+    cache_path = os.path.join(cache_dir, f"{generator_name}.{key}.blend")
+    if os.path.exists(cache_path):
+        print(f"mesh cache hit: {generator_name} {params}")
+        data = load_cached_data(cache_path)
+        obj = bpy.data.objects.new(data.get("cached_object_name", generator_name), data)
+        link_and_activate(obj)
+        return obj
+    obj = build_object(**params)
+    obj.data["cached_object_name"] = obj.name
+    bpy.data.libraries.write(cache_path, {obj.data}, fake_user=True, compress=True)
+    evict_mesh_cache(cache_dir, max_bytes)
+    return obj
@@ -0,0 +1,107 @@
+import functools
+import os
+import time
+import types
+from collections import defaultdict
+from contextlib import contextmanager
+import bpy
+
+
+class CallStats:
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total_time += elapsed
+
+
+class OperatorProfiler:
+    def __init__(self):
+        self.operator_stats = defaultdict(CallStats)
+        self.helper_stats = defaultdict(CallStats)
+        self.call_site_stats = defaultdict(CallStats)
+        self.helper_stack = []
+        self.patched_helpers = {}
+        self.namespace = {}
+        self.operator_class = None
+        self.original_operator_call = None
+
+    def install(self, namespace):
+        # every bpy.ops.<module>.<name> is an instance of the same callable wrapper class
+        self.operator_class = type(bpy.ops.object.select_all)
+        self.original_operator_call = self.operator_class.__call__
+        profiler = self
+
+        def profiled_operator_call(operator, *args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return profiler.original_operator_call(operator, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start_time
+                operator_name = operator.idname_py()
+                caller_name = profiler.helper_stack[-1] if profiler.helper_stack else "<main>"
+                profiler.operator_stats[operator_name].add(elapsed)
+                profiler.call_site_stats[(caller_name, operator_name)].add(elapsed)
+
+        self.operator_class.__call__ = profiled_operator_call
+
+        for name, value in list(namespace.items()):
+            if name == "main" or not isinstance(value, types.FunctionType) or value.__globals__ is not namespace:
+                continue
+            self.patched_helpers[name] = value
+            namespace[name] = self.wrap_helper(name, value)
+        self.namespace = namespace
+
+    def wrap_helper(self, name, func):
+        @functools.wraps(func)
+        def profiled_helper(*args, **kwargs):
+            self.helper_stack.append(name)
+            start_time = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.helper_stats[name].add(time.perf_counter() - start_time)
+                self.helper_stack.pop()
+
+        return profiled_helper
+
+    def uninstall(self):
+        if self.operator_class is not None:
+            self.operator_class.__call__ = self.original_operator_call
+        self.namespace.update(self.patched_helpers)
+        self.patched_helpers = {}
+
+    def print_report(self, limit=15):
+        sections = (
+            ("operators", self.operator_stats),
+            ("helpers (inclusive)", self.helper_stats),
+            ("helper -> operator", self.call_site_stats),
+        )
+        for title, stats in sections:
+            ranked = sorted(stats.items(), key=lambda item: item[1].total_time, reverse=True)[:limit]
+            print(f"--- {title} ---")
+            print(f"{'total (s)':>10} {'calls':>7} {'avg (ms)':>9}  name")
+            for name, call_stats in ranked:
+                if isinstance(name, tuple):
+                    name = " -> ".join(name)
+                average_ms = call_stats.total_time / call_stats.count * 1000
+                print(f"{call_stats.total_time:>10.3f} {call_stats.count:>7} {average_ms:>9.2f}  {name}")
+
+
+@contextmanager
+def profile_operators(namespace, enabled=None):
+    # opt in with OP_PROFILE=1 or enabled=True
+    if enabled is None:
+        enabled = os.environ.get("OP_PROFILE") == "1"
+    if not enabled:
+        yield None
+        return
+    profiler = OperatorProfiler()
+    profiler.install(namespace)
+    try:
+        yield profiler
+    finally:
+        profiler.uninstall()
+        profiler.print_report()
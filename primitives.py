@@ -0,0 +1,213 @@
+import math
+import bpy
+import numpy as np
+
+
+def mesh_from_arrays(name, vertices, faces=None, edges=None):
+    vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", vertices.ravel())
+    if edges is not None and len(edges):
+        edges = np.asarray(edges, dtype=np.int32).reshape(-1, 2)
+        mesh.edges.add(len(edges))
+        mesh.edges.foreach_set("vertices", edges.ravel())
+    if faces is not None and len(faces):
+        faces = np.asarray(faces, dtype=np.int32)
+        face_count, corner_count = faces.shape
+        mesh.loops.add(faces.size)
+        mesh.loops.foreach_set("vertex_index", faces.ravel())
+        mesh.polygons.add(face_count)
+        mesh.polygons.foreach_set("loop_start", np.arange(0, faces.size, corner_count, dtype=np.int32))
+        if bpy.app.version < (3, 6, 0):
+            mesh.polygons.foreach_set("loop_total", np.full(face_count, corner_count, dtype=np.int32))
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def weld_vertices(vertices, faces, decimals=5):
+    quantized = np.round(vertices, decimals=decimals)
+    _, unique_indices, inverse = np.unique(quantized, axis=0, return_index=True, return_inverse=True)
+    return vertices[unique_indices], inverse.reshape(-1)[faces]
+
+
+def get_shared_mesh(name, build_geometry, shared=True):
+    if shared:
+        mesh = bpy.data.meshes.get(name)
+        if mesh is not None:
+            return mesh
+    vertices, faces, edges = build_geometry()
+    return mesh_from_arrays(name, vertices, faces=faces, edges=edges)
+
+
+def add_object(name, data, location=(0, 0, 0), rotation=(0, 0, 0), collection=None):
+    obj = bpy.data.objects.new(name, data)
+    obj.location = location
+    obj.rotation_euler = rotation
+    if collection is None:
+        collection = bpy.context.collection
+    collection.objects.link(obj)
+    return obj
+
+
+def set_object_material(obj, material):
+    if not obj.material_slots:
+        obj.data.materials.append(None)
+    material_slot = obj.material_slots[0]
+    material_slot.link = "OBJECT"
+    material_slot.material = material
+
+
+def build_plane_geometry(size):
+    half_size = size / 2
+    vertices = np.array(
+        [
+            (-half_size, -half_size, 0),
+            (half_size, -half_size, 0),
+            (half_size, half_size, 0),
+            (-half_size, half_size, 0),
+        ]
+    )
+    faces = np.array([(0, 1, 2, 3)])
+    return vertices, faces, None
+
+
+def build_cube_geometry(size):
+    half_size = size / 2
+    corners = np.array([(x, y, z) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)], dtype=np.float64)
+    faces = np.array(
+        [
+            (0, 1, 3, 2),
+            (2, 3, 7, 6),
+            (6, 7, 5, 4),
+            (4, 5, 1, 0),
+            (2, 6, 4, 0),
+            (7, 3, 1, 5),
+        ]
+    )
+    return corners * half_size, faces, None
+
+
+def build_circle_geometry(vertices, radius):
+    phi = np.arange(vertices) * (2 * math.pi / vertices)
+    coords = np.column_stack((-radius * np.sin(phi), radius * np.cos(phi), np.zeros(vertices)))
+    edge_starts = np.arange(vertices)
+    edges = np.column_stack((edge_starts, (edge_starts + 1) % vertices))
+    return coords, None, edges
+
+
+def build_ico_sphere_geometry(radius, subdivisions):
+    ring_z = 1 / math.sqrt(5)
+    ring_radius = 2 / math.sqrt(5)
+    coords = [(0.0, 0.0, 1.0)]
+    for i in range(5):
+        angle = i * 2 * math.pi / 5
+        coords.append((ring_radius * math.cos(angle), ring_radius * math.sin(angle), ring_z))
+    for i in range(5):
+        angle = (i + 0.5) * 2 * math.pi / 5
+        coords.append((ring_radius * math.cos(angle), ring_radius * math.sin(angle), -ring_z))
+    coords.append((0.0, 0.0, -1.0))
+    faces = []
+    for i in range(5):
+        upper, upper_next = 1 + i, 1 + (i + 1) % 5
+        lower, lower_next = 6 + i, 6 + (i + 1) % 5
+        faces.append((0, upper, upper_next))
+        faces.append((upper, lower, upper_next))
+        faces.append((upper_next, lower, lower_next))
+        faces.append((11, lower_next, lower))
+    for _ in range(subdivisions - 1):
+        midpoints = {}
+
+        def midpoint(a, b):
+            key = (min(a, b), max(a, b))
+            if key not in midpoints:
+                midpoints[key] = len(coords)
+                coords.append(tuple((coords[a][axis] + coords[b][axis]) / 2 for axis in range(3)))
+            return midpoints[key]
+
+        subdivided_faces = []
+        for a, b, c in faces:
+            ab, bc, ca = midpoint(a, b), midpoint(b, c), midpoint(c, a)
+            subdivided_faces.extend([(a, ab, ca), (ab, b, bc), (ca, bc, c), (ab, bc, ca)])
+        faces = subdivided_faces
+    coords = np.array(coords)
+    coords *= radius / np.linalg.norm(coords, axis=1)[:, np.newaxis]
+    return coords, np.array(faces), None
+
+
+def build_round_cube_geometry(radius, size, arc_div):
+    half_size = np.asarray(size, dtype=np.float64) / 2
+    angles = np.linspace(-math.pi / 4, math.pi / 4, arc_div * 2 + 1)
+    u, v = np.meshgrid(np.tan(angles), np.tan(angles), indexing="ij")
+    grid_size = len(angles)
+    grid_indices = np.arange(grid_size * grid_size).reshape(grid_size, grid_size)
+    grid_faces = np.column_stack(
+        (
+            grid_indices[:-1, :-1].ravel(),
+            grid_indices[1:, :-1].ravel(),
+            grid_indices[1:, 1:].ravel(),
+            grid_indices[:-1, 1:].ravel(),
+        )
+    )
+    vertices = []
+    faces = []
+    for axis in range(3):
+        for sign in (-1, 1):
+            face_coords = np.empty((grid_size * grid_size, 3))
+            face_coords[:, axis] = sign
+            face_coords[:, (axis + 1) % 3] = u.ravel()
+            face_coords[:, (axis + 2) % 3] = v.ravel()
+            face_grid = grid_faces if sign > 0 else grid_faces[:, ::-1]
+            faces.append(face_grid + len(vertices) * grid_size * grid_size)
+            vertices.append(face_coords)
+    vertices = np.concatenate(vertices)
+    directions = vertices / np.linalg.norm(vertices, axis=1)[:, np.newaxis]
+    vertices = vertices * half_size + directions * radius
+    return (*weld_vertices(vertices, np.concatenate(faces)), None)
+
+
+def add_plane(size=2.0, location=(0, 0, 0), rotation=(0, 0, 0), name="Plane", shared=True):
+    mesh = get_shared_mesh(f"primitive.plane.{size:g}", lambda: build_plane_geometry(size), shared)
+    return add_object(name, mesh, location, rotation)
+
+
+def add_cube(size=2.0, location=(0, 0, 0), rotation=(0, 0, 0), name="Cube", shared=True):
+    mesh = get_shared_mesh(f"primitive.cube.{size:g}", lambda: build_cube_geometry(size), shared)
+    return add_object(name, mesh, location, rotation)
+
+
+def add_circle(vertices=32, radius=1.0, location=(0, 0, 0), rotation=(0, 0, 0), name="Circle", shared=True):
+    mesh = get_shared_mesh(f"primitive.circle.{vertices}.{radius:g}", lambda: build_circle_geometry(vertices, radius), shared)
+    return add_object(name, mesh, location, rotation)
+
+
+def add_circle_curve(vertices=32, radius=1.0, location=(0, 0, 0), rotation=(0, 0, 0), name="Circle"):
+    coords, _, _ = build_circle_geometry(vertices, radius)
+    curve = bpy.data.curves.new(name, type="CURVE")
+    curve.dimensions = "3D"
+    spline = curve.splines.new("POLY")
+    spline.points.add(vertices - 1)
+    points = np.ones((vertices, 4), dtype=np.float32)
+    points[:, :3] = coords
+    spline.points.foreach_set("co", points.ravel())
+    spline.use_cyclic_u = True
+    return add_object(name, curve, location, rotation)
+
+
+def add_ico_sphere(radius=1.0, subdivisions=2, location=(0, 0, 0), rotation=(0, 0, 0), name="Icosphere", shared=True):
+    mesh = get_shared_mesh(
+        f"primitive.ico_sphere.{radius:g}.{subdivisions}",
+        lambda: build_ico_sphere_geometry(radius, subdivisions),
+        shared,
+    )
+    return add_object(name, mesh, location, rotation)
+
+
+def add_round_cube(radius=1.0, size=(0, 0, 0), arc_div=4, location=(0, 0, 0), rotation=(0, 0, 0), name="Roundcube", shared=True):
+    size_key = "x".join(f"{dimension:g}" for dimension in size)
+    mesh = get_shared_mesh(
+        f"primitive.round_cube.{radius:g}.{size_key}.{arc_div}",
+        lambda: build_round_cube_geometry(radius, size, arc_div),
+        shared,
+    )
+    return add_object(name, mesh, location, rotation)
@@ -1,24 +1,59 @@
 import bpy
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from primitives import add_object, build_cube_geometry, mesh_from_arrays, weld_vertices
 
 length=2
 
-def createGroup(length):
-    if length<26:
-        bpy.ops.object.duplicate_move(OBJECT_OT_duplicate={"linked":False, "mode":'TRANSLATION'}, TRANSFORM_OT_translate={"value":(0, 0, -length)})
-        bpy.ops.transform.translate(value=(length/2,0,0))
-        bpy.ops.transform.translate(value=(0,length/2,0))
-        bpy.ops.object.duplicate_move(OBJECT_OT_duplicate={"linked":False, "mode":'TRANSLATION'}, TRANSFORM_OT_translate={"value":(-length, 0, 0)})
-        bpy.ops.object.duplicate_move(OBJECT_OT_duplicate={"linked":False, "mode":'TRANSLATION'}, TRANSFORM_OT_translate={"value":(0, -length, 0)})
-        bpy.ops.object.duplicate_move(OBJECT_OT_duplicate={"linked":False, "mode":'TRANSLATION'}, TRANSFORM_OT_translate={"value":(length, 0, 0)})
-        bpy.ops.object.select_by_type(type='MESH')
-        bpy.ops.object.join()
-        bpy.ops.object.editmode_toggle()
-        bpy.ops.mesh.select_all(action="TOGGLE")
-        bpy.ops.mesh.remove_doubles()
-        bpy.ops.mesh.select_all(action="TOGGLE")
-        bpy.ops.object.editmode_toggle()
+def baseGeometry(obj):
+    if obj is None or obj.type != 'MESH':
+        vertices, faces, _ = build_cube_geometry(2)
+        return vertices, faces
+    mesh = obj.data
+    vertices = np.empty(len(mesh.vertices)*3)
+    mesh.vertices.foreach_get("co", vertices)
+    vertices = vertices.reshape(-1, 3)
+    matrix = np.array(obj.matrix_world)
+    vertices = vertices @ matrix[:3, :3].T + matrix[:3, 3]
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    assert len(set(loop_totals)) == 1, "the base mesh must use a single polygon size"
+    faces = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", faces)
+    return vertices, faces.reshape(len(loop_totals), -1)
+
+def groupOffsets(length, max_length=26):
+    # each level keeps the group and adds four copies one level lower on the diagonals
+    offsets = np.zeros((1, 3))
+    while length<max_length:
+        steps = np.array([(0, 0, 0),
+                          (length/2, length/2, -length),
+                          (-length/2, length/2, -length),
+                          (-length/2, -length/2, -length),
+                          (length/2, -length/2, -length)])
+        offsets = (offsets[np.newaxis, :, :] + steps[:, np.newaxis, :]).reshape(-1, 3)
         length=length*2
-        createGroup(length)
-    return length
-    
-createGroup(length)
+    return offsets
+
+def createGroupMesh(length, max_length=26):
+    source = bpy.context.active_object
+    base_vertices, base_faces = baseGeometry(source)
+    offsets = groupOffsets(length, max_length)
+    vertices = (base_vertices[np.newaxis, :, :] + offsets[:, np.newaxis, :]).reshape(-1, 3)
+    faces = (base_faces[np.newaxis, :, :] + (np.arange(len(offsets))*len(base_vertices))[:, np.newaxis, np.newaxis]).reshape(-1, base_faces.shape[1])
+    # merge coincident vertices like remove_doubles, then drop faces that became identical
+    vertices, faces = weld_vertices(vertices, faces)
+    _, unique_faces = np.unique(np.sort(faces, axis=1), axis=0, return_index=True)
+    faces = faces[np.sort(unique_faces)]
+    obj = add_object("Group", mesh_from_arrays("Group", vertices, faces))
+    if source is not None:
+        source_data = source.data
+        bpy.data.objects.remove(source)
+        if source_data is not None and source_data.users == 0:
+            bpy.data.meshes.remove(source_data)
+    return obj
+
+createGroupMesh(length)
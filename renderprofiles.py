@@ -0,0 +1,90 @@
+import os
+
+# RENDER_PROFILE=draft|preview|final picks a profile per run, RENDER_SAMPLES overrides the sample count
+RENDER_PROFILES = {
+    "draft": {
+        "samples": 16,
+        "adaptive_threshold": 0.1,
+        "denoiser": "OPENIMAGEDENOISE",
+        "tile_size": 256,
+        "max_bounces": 2,
+        "diffuse_bounces": 1,
+        "glossy_bounces": 1,
+        "transmission_bounces": 2,
+        "volume_bounces": 0,
+        "transparent_max_bounces": 4,
+        "resolution_percentage": 50,
+    },
+    "preview": {
+        "samples": 64,
+        "adaptive_threshold": 0.05,
+        "denoiser": "OPENIMAGEDENOISE",
+        "tile_size": 512,
+        "max_bounces": 4,
+        "diffuse_bounces": 2,
+        "glossy_bounces": 2,
+        "transmission_bounces": 4,
+        "volume_bounces": 0,
+        "transparent_max_bounces": 8,
+        "resolution_percentage": 100,
+    },
+    "final": {
+        # None keeps the sample count the script asks for
+        "samples": None,
+        "adaptive_threshold": 0.01,
+        "denoiser": "OPENIMAGEDENOISE",
+        "tile_size": 2048,
+        "max_bounces": 12,
+        "diffuse_bounces": 4,
+        "glossy_bounces": 4,
+        "transmission_bounces": 12,
+        "volume_bounces": 0,
+        "transparent_max_bounces": 8,
+        "resolution_percentage": 100,
+    },
+}
+
+
+def get_available_cpu_count():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def get_render_profile_name(default="final"):
+    profile_name = os.environ.get("RENDER_PROFILE", default)
+    if profile_name not in RENDER_PROFILES:
+        raise ValueError(f"unknown render profile {profile_name!r}, expected one of {sorted(RENDER_PROFILES)}")
+    return profile_name
+
+
+def apply_render_profile(scene, samples, profile_name=None):
+    if profile_name is None:
+        profile_name = get_render_profile_name()
+    profile = RENDER_PROFILES[profile_name]
+
+    scene.render.engine = "CYCLES"
+    scene.cycles.device = "CPU"
+    scene.render.threads_mode = "FIXED"
+    scene.render.threads = get_available_cpu_count()
+    scene.render.use_persistent_data = True
+
+    scene.cycles.samples = int(os.environ.get("RENDER_SAMPLES", profile["samples"] or samples))
+    scene.cycles.use_adaptive_sampling = True
+    scene.cycles.adaptive_threshold = profile["adaptive_threshold"]
+    scene.cycles.use_denoising = True
+    scene.cycles.denoiser = profile["denoiser"]
+    scene.cycles.use_auto_tile = True
+    scene.cycles.tile_size = profile["tile_size"]
+
+    scene.cycles.max_bounces = profile["max_bounces"]
+    scene.cycles.diffuse_bounces = profile["diffuse_bounces"]
+    scene.cycles.glossy_bounces = profile["glossy_bounces"]
+    scene.cycles.transmission_bounces = profile["transmission_bounces"]
+    scene.cycles.volume_bounces = profile["volume_bounces"]
+    scene.cycles.transparent_max_bounces = profile["transparent_max_bounces"]
+    scene.render.resolution_percentage = profile["resolution_percentage"]
+
+    scene["render_profile"] = profile_name
+    print(f"render profile: {profile_name}, {scene.cycles.samples} samples on {scene.render.threads} threads")
+    return profile_name
@@ -0,0 +1,132 @@
+import os
+import shutil
+import subprocess
+import bpy
+
+
+def get_requested_render_workers():
+    # RENDER_SHARDED=<workers> (or "auto") renders through sharded workers, unset renders in this process
+    requested = os.environ.get("RENDER_SHARDED", "0")
+    if requested == "auto":
+        return default_render_worker_count()
+    return int(requested)
+
+
+def default_render_worker_count(threads_per_worker=4):
+    return max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+
+def clear_stale_placeholders(frames_dir):
+    # placeholders are empty files, any left over belong to workers that never finished their frame
+    for name in os.listdir(frames_dir):
+        path = os.path.join(frames_dir, name)
+        if os.path.isfile(path) and os.path.getsize(path) == 0:
+            os.remove(path)
+
+
+def is_frame_rendered(path):
+    return os.path.exists(path) and os.path.getsize(path) > 0
+
+
+def get_missing_frames(scene):
+    return [
+        frame
+        for frame in range(scene.frame_start, scene.frame_end + 1)
+        if not is_frame_rendered(scene.render.frame_path(frame=frame))
+    ]
+
+
+def split_into_shards(frames, shard_count):
+    shard_size = -(-len(frames) // shard_count)
+    return [frames[i : i + shard_size] for i in range(0, len(frames), shard_size)]
+
+
+def encode_frames_to_movie(frames_dir, frame_start, fps, movie_path):
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        print(f"ffmpeg not found, rendered frames are in {frames_dir}")
+        return
+    subprocess.run(
+        [
+            ffmpeg,
+            "-y",
+            "-framerate",
+            str(fps),
+            "-start_number",
+            str(frame_start),
+            "-i",
+            os.path.join(frames_dir, "%04d.png"),
+            "-c:v",
+            "libx264",
+            "-pix_fmt",
+            "yuv420p",
+            movie_path,
+        ],
+        check=True,
+    )
+
+
+def render_loop_sharded(worker_count=None, threads_per_worker=4):
+    scene = bpy.context.scene
+    render = scene.render
+    movie_path = None
+    blend_path = None
+    original_settings = (render.filepath, render.image_settings.file_format, render.use_overwrite, render.use_placeholder)
+    try:
+        if render.image_settings.file_format == "FFMPEG":
+            # movies can not be written by several processes, render a png sequence and encode it at the end
+            movie_path = bpy.path.abspath(render.filepath)
+            render.image_settings.file_format = "PNG"
+            render.filepath = os.path.splitext(movie_path)[0] + "_frames/"
+        render.use_overwrite = False
+        render.use_placeholder = True
+        frames_dir = os.path.dirname(bpy.path.abspath(render.frame_path(frame=scene.frame_start)))
+        os.makedirs(frames_dir, exist_ok=True)
+        clear_stale_placeholders(frames_dir)
+
+        missing_frames = get_missing_frames(scene)
+        frame_total = scene.frame_end - scene.frame_start + 1
+        print(f"{frame_total - len(missing_frames)} of {frame_total} frames already rendered in {frames_dir}")
+        if missing_frames:
+            if worker_count is None:
+                worker_count = default_render_worker_count(threads_per_worker)
+            blend_path = os.path.join(frames_dir, "sharded_render.blend")
+            bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+            processes = []
+            for shard in split_into_shards(missing_frames, worker_count):
+                print(f"rendering frames {shard[0]}-{shard[-1]}")
+                command = [
+                    bpy.app.binary_path,
+                    "--background",
+                    blend_path,
+                    "--threads",
+                    str(threads_per_worker),
+                    "--scene",
+                    scene.name,
+                    "--frame-start",
+                    str(shard[0]),
+                    "--frame-end",
+                    str(shard[-1]),
+                    "--render-anim",
+                ]
+                processes.append(subprocess.Popen(command, stdout=subprocess.DEVNULL))
+            return_codes = [process.wait() for process in processes]
+            if any(return_codes):
+                print(f"render workers failed with {return_codes}, run again to resume")
+
+        missing_frames = get_missing_frames(scene)
+        if not missing_frames and movie_path:
+            encode_frames_to_movie(frames_dir, scene.frame_start, render.fps, movie_path)
+        return missing_frames
+    finally:
+        # the user's scene keeps its own output settings whatever happened above
+        render.filepath, render.image_settings.file_format, render.use_overwrite, render.use_placeholder = original_settings
+        if blend_path and os.path.exists(blend_path):
+            os.remove(blend_path)
+
+def render_loop():
+    worker_count = get_requested_render_workers()
+    if worker_count:
+        return render_loop_sharded(worker_count)
+    bpy.ops.render.render(animation=True)
+    return []
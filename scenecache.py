@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import bpy
+from meshcache import evict_mesh_cache
+
+SCENE_CACHE_DIR = os.environ.get("SCENE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "blender_scene_cache"))
+SCENE_CACHE_MAX_BYTES = 4 * 1024 * 1024 * 1024
+
+
+def is_scene_cache_enabled():
+    return os.environ.get("SCENE_CACHE", "1") != "0"
+
+
+def is_seed_requested():
+    return "SCENE_SEED" in os.environ
+
+
+def get_requested_seed(default=0):
+    # SCENE_SEED=<seed printed by time_seed> rebuilds, or reopens, that exact variation
+    return float(os.environ.get("SCENE_SEED", default))
+
+
+def get_code_hash(script_path):
+    # the script plus every module it imported from the same folder
+    script_dir = os.path.dirname(os.path.abspath(script_path))
+    source_paths = {os.path.abspath(script_path)}
+    for module in list(sys.modules.values()):
+        module_path = getattr(module, "__file__", None)
+        if module_path and os.path.dirname(os.path.abspath(module_path)) == script_dir:
+            source_paths.add(os.path.abspath(module_path))
+    code_hash = hashlib.sha1()
+    for source_path in sorted(source_paths):
+        with open(source_path, "rb") as source_file:
+            code_hash.update(source_file.read())
+    return code_hash.hexdigest()
+
+
+def build_scene_manifest(script_path, seed, fps, loop_seconds, palette=None, **params):
+    render = bpy.context.scene.render
+    return {
+        "script": os.path.basename(script_path),
+        "seed": seed,
+        "fps": fps,
+        "loop_seconds": loop_seconds,
+        "resolution": [render.resolution_x, render.resolution_y, render.resolution_percentage],
+        "render_profile": bpy.context.scene.get("render_profile"),
+        "samples": bpy.context.scene.cycles.samples,
+        "palette": palette,
+        "code_hash": get_code_hash(script_path),
+        "blender": bpy.app.version_string,
+        **params,
+    }
+
+
+def get_scene_cache_path(manifest):
+    key = hashlib.sha1(json.dumps(manifest, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    script_name = os.path.splitext(manifest["script"])[0]
+    return os.path.join(SCENE_CACHE_DIR, f"{script_name}.{key}.blend")
+
+
+def load_cached_scene(manifest):
+    cache_path = get_scene_cache_path(manifest)
+    if not is_scene_cache_enabled() or not os.path.exists(cache_path):
+        return False
+    print(f"reopening cached scene {cache_path}")
+    os.utime(cache_path)
+    bpy.ops.wm.open_mainfile(filepath=cache_path)
+    return True
+
+
+def save_cached_scene(manifest):
+    # a time seeded build can never be asked for again, only cache scenes picked with SCENE_SEED
+    if not is_scene_cache_enabled() or not is_seed_requested():
+        return None
+    os.makedirs(SCENE_CACHE_DIR, exist_ok=True)
+    cache_path = get_scene_cache_path(manifest)
+    bpy.context.scene["scene_manifest"] = json.dumps(manifest, sort_keys=True, default=str)
+    bpy.ops.wm.save_as_mainfile(filepath=cache_path, copy=True)
+    evict_mesh_cache(SCENE_CACHE_DIR, SCENE_CACHE_MAX_BYTES)
+    print(f"cached scene saved to {cache_path}")
+    return cache_path
@@ -0,0 +1,53 @@
+import bpy
+
+CLEAN_SCENE_DATA_COLLECTIONS = (
+    "objects",
+    "collections",
+    "meshes",
+    "curves",
+    "lights",
+    "cameras",
+    "materials",
+    "textures",
+    "node_groups",
+    "actions",
+    "worlds",
+)
+# lives in driver_namespace so handlers registered by an earlier run of a script are still found after a re-run
+FRAME_CHANGE_HANDLERS_KEY = "sceneutils.frame_change_handlers"
+
+
+def get_registered_frame_change_handlers():
+    return bpy.app.driver_namespace.setdefault(FRAME_CHANGE_HANDLERS_KEY, {})
+
+
+def register_frame_change_handler(key, handler):
+    unregister_frame_change_handlers(key)
+    bpy.app.handlers.frame_change_pre.append(handler)
+    get_registered_frame_change_handlers()[key] = handler
+
+
+def unregister_frame_change_handlers(key=None):
+    registered_handlers = get_registered_frame_change_handlers()
+    handler_keys = list(registered_handlers) if key is None else [key]
+    for handler_key in handler_keys:
+        handler = registered_handlers.pop(handler_key, None)
+        if handler in bpy.app.handlers.frame_change_pre:
+            bpy.app.handlers.frame_change_pre.remove(handler)
+
+
+def clean_scene_fast():
+    if bpy.context.active_object and bpy.context.active_object.mode == "EDIT":
+        bpy.ops.object.editmode_toggle()
+    # registered handlers point at objects that are about to be removed
+    unregister_frame_change_handlers()
+    ids = []
+    for data_collection_name in CLEAN_SCENE_DATA_COLLECTIONS:
+        ids.extend(getattr(bpy.data, data_collection_name))
+    bpy.data.batch_remove(ids)
+    orphan_images = [image for image in bpy.data.images if image.users == 0]
+    if orphan_images:
+        bpy.data.batch_remove(orphan_images)
+    world = bpy.data.worlds.new("World")
+    world.use_nodes = True
+    bpy.context.scene.world = world
@@ -6,65 +6,18 @@ import math
 import bpy
 
 import addon_utils
+import os
+import sys
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from colorutils import hex_color_to_rgba
+from sceneutils import clean_scene_fast
+from meshcache import cached_object
+from opprofiler import profile_operators
+from renderprofiles import apply_render_profile
+from primitives import add_circle
 
 
-def purge_orphans():
-
-    if bpy.app.version >= (3, 0, 0):
-
-        bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
-    else:
-
-        result = bpy.ops.outliner.orphans_purge()
-        if result.pop() != "CANCELLED":
-            purge_orphans()
-
-
-def clean_scene():
-
-    if bpy.context.active_object and bpy.context.active_object.mode == "EDIT":
-        bpy.ops.object.editmode_toggle()
-
-
-    for obj in bpy.data.objects:
-        obj.hide_set(False)
-        obj.hide_select = False
-        obj.hide_viewport = False
-
-
-    bpy.ops.object.select_all(action="SELECT")
-    bpy.ops.object.delete()
-
-
-    collection_names = [col.name for col in bpy.data.collections]
-    for name in collection_names:
-        bpy.data.collections.remove(bpy.data.collections[name])
-
-
-    world_names = [world.name for world in bpy.data.worlds]
-    for name in world_names:
-        bpy.data.worlds.remove(bpy.data.worlds[name])
-
-    bpy.ops.world.new()
-    bpy.context.scene.world = bpy.data.worlds["World"]
-
-    purge_orphans()
-
-
-def clean_scene_experimental():
-
-    old_scene_name = "to_delete"
-    bpy.context.window.scene.name = old_scene_name
-    bpy.ops.scene.new()
-    bpy.data.scenes.remove(bpy.data.scenes[old_scene_name])
-
-
-    bpy.ops.world.new()
-    bpy.context.scene.world = bpy.data.worlds["World"]
-
-    purge_orphans()
-
 
 def active_object():
 
@@ -78,7 +31,9 @@ def time_seed():
     random.seed(seed)
 
 
-    bpy.context.window_manager.clipboard = str(seed)
+    bpy.context.scene["seed"] = seed
+    if not bpy.app.background:
+        bpy.context.window_manager.clipboard = str(seed)
 
     return seed
 
@@ -124,64 +79,16 @@ def set_fcurve_interpolation_to_linear(obj=None):
     if obj is None:
         obj = active_object()
 
-    for fcurve in bpy.context.active_object.animation_data.action.fcurves:
+    for fcurve in obj.animation_data.action.fcurves:
         for keyframe_point in fcurve.keyframe_points:
             keyframe_point.interpolation = "LINEAR"
 
 
-def hex_color_to_rgb(hex_color):
-
-    if hex_color.startswith("#"):
-        hex_color = hex_color[1:]
-
-    assert len(hex_color) == 6, f"RRGGBB is the supported hex color format: {hex_color}"
-
-
-    red = int(hex_color[:2], 16)
-
-    srgb_red = red / 255
-    linear_red = convert_srgb_to_linear_rgb(srgb_red)
-
-
-    green = int(hex_color[2:4], 16)
-
-    srgb_green = green / 255
-    linear_green = convert_srgb_to_linear_rgb(srgb_green)
-
-
-    blue = int(hex_color[4:6], 16)
-
-    srgb_blue = blue / 255
-    linear_blue = convert_srgb_to_linear_rgb(srgb_blue)
-
-    return tuple([linear_red, linear_green, linear_blue])
-
-
-def hex_color_to_rgba(hex_color, alpha=1.0):
-
-    linear_red, linear_green, linear_blue = hex_color_to_rgb(hex_color)
-    return tuple([linear_red, linear_green, linear_blue, alpha])
-
-
-def convert_srgb_to_linear_rgb(srgb_color_component):
-
-    if srgb_color_component <= 0.04045:
-        linear_color_component = srgb_color_component / 12.92
-    else:
-        linear_color_component = math.pow((srgb_color_component + 0.055) / 1.055, 2.4)
-
-    return linear_color_component
-
-
-def duplicate_object(obj=None, linked=False):
-    if obj is None:
-        obj = active_object()
-    bpy.ops.object.select_all(action="DESELECT")
-    obj.select_set(True)
-    bpy.context.view_layer.objects.active = obj
-    bpy.ops.object.duplicate(linked=linked)
-    duplicate_obj = active_object()
-    return duplicate_obj
+def copy_object_linked(obj):
+    linked_obj = obj.copy()
+    for collection in obj.users_collection:
+        collection.objects.link(linked_obj)
+    return linked_obj
 
 
 def enable_addon(addon_module_name):
@@ -241,9 +148,7 @@ def set_scene_props(fps, loop_seconds):
     scene.render.fps = fps
     scene.frame_current = 1
     scene.frame_start = 1
-    scene.render.engine = "CYCLES"
-    scene.cycles.device = "GPU"
-    scene.cycles.samples = 300
+    apply_render_profile(scene, samples=300)
     scene.view_settings.look = "Very High Contrast"
     set_1080px_square_render_res()
 
@@ -260,11 +165,7 @@ def scene_setup(i=0):
         random.seed(seed)
     else:
         time_seed()
-    use_clean_scene_experimental = False
-    if use_clean_scene_experimental:
-        clean_scene_experimental()
-    else:
-        clean_scene()
+    clean_scene_fast()
     set_scene_props(fps, loop_seconds)
     z_coord = 1
     loc = (6.5, -3, z_coord)
@@ -302,8 +203,7 @@ def add_lights():
     bpy.ops.object.light_add(type="AREA", radius=5, location=(0, 0, 5))
 
 def create_light_rig(light_count, light_type="AREA", rig_radius=2.0, light_radius=1.0, energy=100):
-    bpy.ops.mesh.primitive_circle_add(vertices=light_count, radius=rig_radius)
-    rig_obj = active_object()
+    rig_obj = add_circle(vertices=light_count, radius=rig_radius)
     empty = add_empty(name=f"empty.tracker-target.lights")
     for i in range(light_count):
         loc = rig_obj.data.vertices[i].co
@@ -315,16 +215,21 @@ def create_light_rig(light_count, light_type="AREA", rig_radius=2.0, light_radiu
         light.constraints["Track To"].target = empty
     return rig_obj, empty
 
-def make_surface(color):
-    bpy.ops.mesh.primitive_z_function_surface(div_x=64, div_y=64, size_x=1, size_y=1)
+def make_surface_geometry(div_x=64, div_y=64, bevel_width=0.001):
+    bpy.ops.mesh.primitive_z_function_surface(div_x=div_x, div_y=div_y, size_x=1, size_y=1)
     surface = active_object()
     bpy.ops.object.shade_smooth()
     surface.data.use_auto_smooth = True
     bpy.ops.object.modifier_add(type="SOLIDIFY")
     bpy.ops.object.modifier_add(type="BEVEL")
-    surface.modifiers["Bevel"].width = 0.001
+    surface.modifiers["Bevel"].width = bevel_width
     surface.modifiers["Bevel"].limit_method = "NONE"
     bpy.ops.object.apply_all_modifiers()
+    return surface
+
+def make_surface(color):
+    params = {"div_x": 64, "div_y": 64, "bevel_width": 0.001}
+    surface = cached_object("z_function_surface", make_surface_geometry, params)
     apply_metallic_material(color, name="metallic", roughness=random.uniform(0.35, 0.65))
     return surface
 
@@ -342,7 +247,7 @@ def animate_object_update(context, obj, current_frame):
     obj.keyframe_insert("scale", frame=frame)
     obj.keyframe_insert("location", frame=frame)
     obj.keyframe_insert("rotation_euler", frame=frame)
-    set_fcurve_interpolation_to_linear()
+    set_fcurve_interpolation_to_linear(obj)
 
 def create_centerpiece(context, color):
     frame_step = 6
@@ -351,7 +256,7 @@ def create_centerpiece(context, color):
     current_frame = -context["frame_count_loop"]
     surface = make_surface(color)
     for _ in range(count):
-        duplicate_surface = duplicate_object(surface)
+        duplicate_surface = copy_object_linked(surface)
         animate_object_update(context, duplicate_surface, current_frame)
         current_frame += frame_step
 
@@ -364,13 +269,14 @@ def create_background(color):
     bpy.ops.mesh.primitive_plane_add(size=100, location=(0, 0, 0.5))
 
 def main():
-    context = scene_setup()
-    enable_extra_meshes()
-    enable_mod_tools()
-    color = get_random_color()
-    create_centerpiece(context, color)
-    create_background(color)
-    add_lights()
+    with profile_operators(globals()):
+        context = scene_setup()
+        enable_extra_meshes()
+        enable_mod_tools()
+        color = get_random_color()
+        create_centerpiece(context, color)
+        create_background(color)
+        add_lights()
 
 if __name__ == "__main__":
     main()
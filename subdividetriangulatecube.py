@@ -4,6 +4,11 @@ import random
 import time
 
 import bpy
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from animutils import write_keyframes
 
 
 
@@ -62,36 +67,24 @@ def time_seed():
     print(f"seed: {seed}")
     random.seed(seed)
 
-    bpy.context.window_manager.clipboard = str(seed)
+    bpy.context.scene["seed"] = seed
+    if not bpy.app.background:
+        bpy.context.window_manager.clipboard = str(seed)
 
     return seed
 
 
-def set_fcurve_extrapolation_to_linear():
-    for fc in bpy.context.active_object.animation_data.action.fcurves:
-        fc.extrapolation = "LINEAR"
-
-
 def create_data_animation_loop(obj, data_path, start_value, mid_value, start_frame, loop_length, linear_extrapolation=True):
-
     setattr(obj, data_path, start_value)
-
-    obj.keyframe_insert(data_path, frame=start_frame)
-
-
-    setattr(obj, data_path, mid_value)
-
     mid_frame = start_frame + (loop_length) / 2
-    obj.keyframe_insert(data_path, frame=mid_frame)
-
-
-    setattr(obj, data_path, start_value)
-
     end_frame = start_frame + loop_length
-    obj.keyframe_insert(data_path, frame=end_frame)
-
-    if linear_extrapolation:
-        set_fcurve_extrapolation_to_linear()
+    write_keyframes(
+        obj,
+        data_path,
+        frames=(start_frame, mid_frame, end_frame),
+        values=(start_value, mid_value, start_value),
+        extrapolation="LINEAR" if linear_extrapolation else None,
+    )
 
 
 def set_scene_props(fps, frame_count):
@@ -1,14 +1,21 @@
 
 
 import bpy
+import bmesh
 from bpy import data as D
 from bpy import context as C
 from bpy import ops as O
 
 from mathutils import *
 from math import *
-from random import randint
-from time import sleep
+from random import Random
+from time import sleep, perf_counter
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from primitives import add_object, mesh_from_arrays
 
 def create_cube(name, x_loc, y_loc, z_loc, x_scl, y_scl, z_scl):
     O.mesh.primitive_cube_add(location=(x_loc,y_loc,z_loc))
@@ -80,51 +87,224 @@ def bool_all_meshes(count, bool_op):
                 O.object.modifier_apply()
 
 
-            
-def create_random_blocks(count, z_min, z_max, x_scale, y_scale):
+
+def union_all_meshes(base_name, bool_op='UNION'):
+
+    base = D.objects[base_name]
+    blocks = D.collections.new("Blocks")
+    C.scene.collection.children.link(blocks)
+    
+    # move every other mesh into one collection used as the boolean operand
+    for obj in [obj for obj in C.scene.objects if obj.type == "MESH" and obj != base]:
+        for collection in obj.users_collection:
+            collection.objects.unlink(obj)
+        blocks.objects.link(obj)
     
+    mod = base.modifiers.new('Boolean', type='BOOLEAN')
+    mod.operation = bool_op
+    mod.operand_type = 'COLLECTION'
+    mod.collection = blocks
+    mod.solver = 'EXACT'
+    
+    # evaluate all blocks in a single boolean and bake the result into the base mesh
+    depsgraph = C.evaluated_depsgraph_get()
+    union_mesh = D.meshes.new_from_object(base.evaluated_get(depsgraph))
+    old_mesh = base.data
+    base.modifiers.remove(mod)
+    base.data = union_mesh
+    union_mesh.name = old_mesh.name
+    
+    block_meshes = [obj.data for obj in blocks.objects]
+    D.batch_remove([*blocks.objects, *block_meshes, blocks, old_mesh])
 
-    default_coord = (2*x_scale*2*y_scale) + x_scale + y_scale
-    coord_locs = [default_coord] * count  
+            
+def sample_block_locations(count, x_scale, y_scale, rng, block_size=1):
+    
+    # every integer cell the block centre may use, visited in random order
+    cells = [(x, y)
+             for x in range(-x_scale + block_size, x_scale - block_size + 1)
+             for y in range(-y_scale + block_size, y_scale - block_size + 1)]
+    rng.shuffle(cells)
+    
+    # spatial hash of taken centres: blocks overlap when both offsets are below 2*block_size
+    reach = 2 * block_size - 1
+    occupied = set()
+    locations = []
+    
+    for x_loc, y_loc in cells:
+        if len(locations) == count:
+            break
+        
+        if any((x_loc + dx, y_loc + dy) in occupied
+               for dx in range(-reach, reach + 1)
+               for dy in range(-reach, reach + 1)):
+            continue
+        
+        occupied.add((x_loc, y_loc))
+        locations.append((x_loc, y_loc))
+    
+    if len(locations) < count:
         
+        # the random pass leaves gaps, a regular lattice packs the base tightly
+        lattice = [(x, y)
+                   for x in range(-x_scale + block_size, x_scale - block_size + 1, 2 * block_size)
+                   for y in range(-y_scale + block_size, y_scale - block_size + 1, 2 * block_size)]
+        if len(lattice) < count:
+            raise ValueError(f"Only {len(lattice)} of {count} blocks fit on a "
+                             f"{2*x_scale}x{2*y_scale} base without overlapping, "
+                             f"the random sampler placed {len(locations)}")
+        locations = rng.sample(lattice, count)
+    
+    return locations
+
+            
+def create_random_blocks(count, z_min, z_max, x_scale, y_scale, seed=None):
+    
+    rng = Random(seed)
+    x_scl = y_scl = 1
+    locations = sample_block_locations(count, x_scale, y_scale, rng, block_size=x_scl)
 
-    for i in range(count):
+    for i, (x_loc, y_loc) in enumerate(locations):
         block_name = "Block_" + str(i)
         
-        x_scl = y_scl = 1
-        z_scl = randint(z_min, z_max)
+        z_scl = rng.randint(z_min, z_max)
         z_loc = z_scl
         
+        create_cube(block_name, x_loc, y_loc, z_loc, x_scl, y_scl, z_scl)
+        
 
-        while(True):
-            loc_exist_flag = False
-            x_loc = randint(-x_scale + x_scl, x_scale - x_scl)
-            y_loc = randint(-y_scale + y_scl, y_scale - y_scl)
-            
-            cur_loc = ((y_loc * y_scale) + (x_scale*y_scale) + x_loc + x_scale)
-            
+        round_off_block(block_name, z_scl)
 
-            for exist_loc in coord_locs:
+def add_frustum(bm, x_loc, y_loc, z_bottom, z_top, bottom_half, top_half):
+    
+    corners = [(-1, -1), (1, -1), (1, 1), (-1, 1)]
+    bottom = [bm.verts.new((x_loc + x*bottom_half[0], y_loc + y*bottom_half[1], z_bottom)) for x, y in corners]
+    top = [bm.verts.new((x_loc + x*top_half[0], y_loc + y*top_half[1], z_top)) for x, y in corners]
+    
+    bm.faces.new(top)
+    bm.faces.new(bottom[::-1])
+    for i in range(4):
+        bm.faces.new((bottom[i], bottom[(i+1) % 4], top[(i+1) % 4], top[i]))
 
-                if (exist_loc == default_coord):
-                    break
-                
 
-                if ((exist_loc - 1 <= cur_loc <= exist_loc + 1) \
-                or (exist_loc + y_scale - 1 <= cur_loc <= exist_loc + y_scale + 1) \
-                or (exist_loc - y_scale - 1 <= cur_loc <= exist_loc - y_scale + 1)):
-                    loc_exist_flag = True
-                    break
-            
-            if (loc_exist_flag == False):
+def build_blocks_bmesh(name, locations, z_scales, x_scale, y_scale, block_size=1):
+    
+    bm = bmesh.new()
+    
+    # base slab, then every block as the flared shape round_off_block produces
+    add_frustum(bm, 0, 0, -0.2, 0, (x_scale, y_scale), (x_scale, y_scale))
+    for (x_loc, y_loc), z_scl in zip(locations, z_scales):
+        add_frustum(bm, x_loc, y_loc, 0, 2*z_scl, (2*block_size, 2*block_size), (block_size, block_size))
+    
+    mesh = D.meshes.new(name)
+    bm.to_mesh(mesh)
+    bm.free()
+    return add_object(name, mesh)
+
+
+def create_bmesh_blocks(count, z_min, z_max, x_scale, y_scale, seed=None):
+    
+    rng = Random(seed)
+    locations = sample_block_locations(count, x_scale, y_scale, rng)
+    z_scales = [rng.randint(z_min, z_max) for _ in locations]
+    
+    return build_blocks_bmesh("Terrain", locations, z_scales, x_scale, y_scale)
+
 
-                coord_locs[i] = cur_loc
-                break      
+def rasterize_blocks(locations, z_scales, x_scale, y_scale, resolution):
+    
+    xs = np.linspace(-x_scale, x_scale, 2*x_scale*resolution + 1)
+    ys = np.linspace(-y_scale, y_scale, 2*y_scale*resolution + 1)
+    height_map = np.zeros((len(ys), len(xs)), dtype=np.float32)
+    
+    # a rounded-off block is 2*z_scl tall over its 2x2 top and slopes to 0 at the 4x4 flare
+    reach = 2 * resolution
+    for (x_loc, y_loc), z_scl in zip(locations, z_scales):
+        col = (x_loc + x_scale) * resolution
+        row = (y_loc + y_scale) * resolution
+        col_start, col_end = max(col - reach, 0), min(col + reach + 1, len(xs))
+        row_start, row_end = max(row - reach, 0), min(row + reach + 1, len(ys))
         
-        create_cube(block_name, x_loc, y_loc, z_loc, x_scl, y_scl, z_scl)
+        dx = np.abs(xs[col_start:col_end] - x_loc)
+        dy = np.abs(ys[row_start:row_end] - y_loc)
+        distance = np.maximum(dy[:, np.newaxis], dx[np.newaxis, :])
+        block = 2 * z_scl * np.clip(2 - distance, 0, 1)
         
+        window = height_map[row_start:row_end, col_start:col_end]
+        np.maximum(window, block, out=window)
+    
+    return xs, ys, height_map
+
+
+def add_value_noise(height_map, rng, amplitude=0.2, cell_size=16, octaves=3):
+    
+    np_rng = np.random.default_rng(rng.getrandbits(64))
+    rows, cols = height_map.shape
+    
+    for octave in range(octaves):
+        lattice = np_rng.random((rows // cell_size + 2, cols // cell_size + 2))
+        
+        y = np.arange(rows) / cell_size
+        x = np.arange(cols) / cell_size
+        y_cell, x_cell = y.astype(int), x.astype(int)
+        # smoothstep between lattice points
+        fy = (y - y_cell) ** 2 * (3 - 2 * (y - y_cell))
+        fx = (x - x_cell) ** 2 * (3 - 2 * (x - x_cell))
+        
+        top = lattice[y_cell][:, x_cell] * (1 - fx) + lattice[y_cell][:, x_cell + 1] * fx
+        bottom = lattice[y_cell + 1][:, x_cell] * (1 - fx) + lattice[y_cell + 1][:, x_cell + 1] * fx
+        noise = top * (1 - fy[:, np.newaxis]) + bottom * fy[:, np.newaxis]
+        
+        height_map += ((noise - 0.5) * amplitude).astype(height_map.dtype)
+        amplitude /= 2
+        cell_size = max(cell_size // 2, 1)
+    
+    return height_map
+
+
+def grid_mesh_arrays(xs, ys, heights):
+    
+    rows, cols = heights.shape
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    vertices = np.column_stack((grid_x.ravel(), grid_y.ravel(), heights.ravel()))
+    
+    indices = np.arange(rows * cols).reshape(rows, cols)
+    faces = np.column_stack((indices[:-1, :-1].ravel(), indices[:-1, 1:].ravel(),
+                             indices[1:, 1:].ravel(), indices[1:, :-1].ravel()))
+    return vertices, faces
+
+
+def create_heightfield_terrain(name, xs, ys, height_map, tile_size=512):
+    
+    # neighbouring tiles share their border row/column so the terrain has no gaps
+    rows, cols = height_map.shape
+    tiles = []
+    for row in range(0, rows - 1, tile_size):
+        for col in range(0, cols - 1, tile_size):
+            row_end = min(row + tile_size, rows - 1) + 1
+            col_end = min(col + tile_size, cols - 1) + 1
+            vertices, faces = grid_mesh_arrays(xs[col:col_end], ys[row:row_end],
+                                               height_map[row:row_end, col:col_end])
+            tile_name = f"{name}_{row // tile_size}_{col // tile_size}"
+            tiles.append(add_object(tile_name, mesh_from_arrays(tile_name, vertices, faces)))
+    
+    return tiles
+
+
+def create_heightfield_blocks(count, z_min, z_max, x_scale, y_scale, seed=None,
+                              resolution=8, noise_amplitude=0.0, tile_size=512):
+    
+    # same draw order as create_random_blocks so a seed gives the same layout in both modes
+    rng = Random(seed)
+    locations = sample_block_locations(count, x_scale, y_scale, rng)
+    z_scales = [rng.randint(z_min, z_max) for _ in locations]
+    
+    xs, ys, height_map = rasterize_blocks(locations, z_scales, x_scale, y_scale, resolution)
+    if noise_amplitude:
+        add_value_noise(height_map, rng, amplitude=noise_amplitude)
+    
+    return create_heightfield_terrain("Terrain", xs, ys, height_map, tile_size)
 
-        round_off_block(block_name, z_scl)
 
 def select_all_meshes():
     for obj in C.scene.objects:
@@ -146,18 +326,43 @@ def main():
         
     base_x_scl = 10
     base_y_scl = 10
-    create_cube("Base", 0, 0, -0.1, base_x_scl, base_y_scl, 0.1)
-
     cube_z_min = 1
     cube_z_max = 3
     count = 5 
+    seed = None
     
-    create_random_blocks(count, cube_z_min, cube_z_max, base_x_scl, base_y_scl)
-    
-    bool_all_meshes(count, 'UNION')
+    # TERRAIN_MODE=OPERATORS builds and unions each block with bpy.ops, BMESH writes all blocks
+    # into one mesh in a single pass, HEIGHTFIELD emits a height map grid
+    terrain_mode = os.environ.get('TERRAIN_MODE', 'OPERATORS')
+    if terrain_mode == 'BMESH':
+        start_time = perf_counter()
+        create_bmesh_blocks(count, cube_z_min, cube_z_max, base_x_scl, base_y_scl, seed)
+        print(f"bmesh terrain of {count} blocks took {perf_counter() - start_time:.2f}s")
+        return
+    if terrain_mode == 'HEIGHTFIELD':
+        start_time = perf_counter()
+        create_heightfield_blocks(count, cube_z_min, cube_z_max, base_x_scl, base_y_scl, seed,
+                                  resolution=8, noise_amplitude=0.1)
+        print(f"Heightfield terrain of {count} blocks took {perf_counter() - start_time:.2f}s")
+        return
 
-    select_all_meshes()
-    O.object.join()
+    create_cube("Base", 0, 0, -0.1, base_x_scl, base_y_scl, 0.1)
+
+    create_random_blocks(count, cube_z_min, cube_z_max, base_x_scl, base_y_scl, seed)
+    
+    # TERRAIN_UNION=PAIRWISE runs the original one modifier per pair union for comparison
+    union_mode = os.environ.get('TERRAIN_UNION', 'COLLECTION')
+    start_time = perf_counter()
+    if union_mode == 'COLLECTION':
+        union_all_meshes("Base", 'UNION')
+    else:
+        bool_all_meshes(count, 'UNION')
+        select_all_meshes()
+        O.object.join()
+    elapsed = perf_counter() - start_time
+    
+    # run once with each TERRAIN_UNION value to compare the two measured timings
+    print(f"{union_mode.lower()} boolean union of {count} blocks took {elapsed:.2f}s")
 
 
 if __name__ == "__main__":
@@ -6,42 +6,15 @@ import random
 import time
 import bpy
 import addon_utils
+import os
+import sys
 
-def purge_orphans():
-    if bpy.app.version >= (3, 0, 0):
-        bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
-    else:
-        result = bpy.ops.outliner.orphans_purge()
-        if result.pop() != "CANCELLED":
-            purge_orphans()
-
-def clean_scene():
-    if bpy.context.active_object and bpy.context.active_object.mode == "EDIT":
-        bpy.ops.object.editmode_toggle()
-    for obj in bpy.data.objects:
-        obj.hide_set(False)
-        obj.hide_select = False
-        obj.hide_viewport = False
-    bpy.ops.object.select_all(action="SELECT")
-    bpy.ops.object.delete()
-    collection_names = [col.name for col in bpy.data.collections]
-    for name in collection_names:
-        bpy.data.collections.remove(bpy.data.collections[name])
-    world_names = [world.name for world in bpy.data.worlds]
-    for name in world_names:
-        bpy.data.worlds.remove(bpy.data.worlds[name])
-    bpy.ops.world.new()
-    bpy.context.scene.world = bpy.data.worlds["World"]
-    purge_orphans()
-
-def clean_scene_experimental():
-    old_scene_name = "to_delete"
-    bpy.context.window.scene.name = old_scene_name
-    bpy.ops.scene.new()
-    bpy.data.scenes.remove(bpy.data.scenes[old_scene_name])
-    bpy.ops.world.new()
-    bpy.context.scene.world = bpy.data.worlds["World"]
-    purge_orphans()
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from colorutils import hex_color_to_rgba
+from sceneutils import clean_scene_fast, register_frame_change_handler
+from opprofiler import profile_operators
+from scenecache import build_scene_manifest, get_requested_seed, load_cached_scene, save_cached_scene
+from renderprofiles import apply_render_profile
 
 def active_object():
     return bpy.context.active_object
@@ -50,7 +23,9 @@ def time_seed():
     seed = time.time()
     print(f"seed: {seed}")
     random.seed(seed)
-    bpy.context.window_manager.clipboard = str(seed)
+    bpy.context.scene["seed"] = seed
+    if not bpy.app.background:
+        bpy.context.window_manager.clipboard = str(seed)
     return seed
 
 def add_ctrl_empty(name=None):
@@ -108,38 +83,11 @@ def set_fcurve_extrapolation_to_linear():
     for fc in bpy.context.active_object.animation_data.action.fcurves:
         fc.extrapolation = "LINEAR"
 
-def hex_color_to_rgb(hex_color):
-    if hex_color.startswith("#"):
-        hex_color = hex_color[1:]
-    assert len(hex_color) == 6, f"RRGGBB is the supported hex color format: {hex_color}"
-    red = int(hex_color[:2], 16)
-    srgb_red = red / 255
-    linear_red = convert_srgb_to_linear_rgb(srgb_red)
-    green = int(hex_color[2:4], 16)
-    srgb_green = green / 255
-    linear_green = convert_srgb_to_linear_rgb(srgb_green)
-    blue = int(hex_color[4:6], 16)
-    srgb_blue = blue / 255
-    linear_blue = convert_srgb_to_linear_rgb(srgb_blue)
-    return tuple([linear_red, linear_green, linear_blue])
-
-def hex_color_to_rgba(hex_color, alpha=1.0):
-    linear_red, linear_green, linear_blue = hex_color_to_rgb(hex_color)
-    return tuple([linear_red, linear_green, linear_blue, alpha])
-
-def convert_srgb_to_linear_rgb(srgb_color_component):
-    if srgb_color_component <= 0.04045:
-        linear_color_component = srgb_color_component / 12.92
-    else:
-        linear_color_component = math.pow((srgb_color_component + 0.055) / 1.055, 2.4)
-    return linear_color_component
-
 def deselect_all_objects():
     for obj in bpy.data.objects:
         obj.select_set(False)
 
 def create_collection(collection_name):
-    deselect_all_objects()
     collection = bpy.data.collections.new(name=collection_name)
     bpy.context.scene.collection.children.link(collection)
     return collection
@@ -157,21 +105,33 @@ def add_to_collection(collection_name, obj=None, base_collection=None):
     base_collection.objects.unlink(obj)
 
 def make_instance_of_collection(collection_name, location, rotation_euler=None, base_collection=None):
+    collection_instances = make_instances_of_collection(collection_name, [location], base_collection=base_collection)
+    if not collection_instances:
+        return
+    collection_instance = collection_instances[0]
+    if rotation_euler:
+        collection_instance.rotation_euler = rotation_euler
+    return collection_instance
+
+def make_instances_of_collection(collection_name, locations, z_rotations=None, base_collection=None):
     source_collection = bpy.data.collections.get(collection_name)
     if source_collection is None:
         logging.error("couldn't find a collection with the name '%s' ", collection_name)
-        return
+        return []
     if base_collection is None:
         base_collection = bpy.context.scene.collection
-    new_name = f"{collection_name}.instance.{str(location)}"
-    collection_instance = bpy.data.objects.new(name=new_name, object_data=None)
-    collection_instance.location = location
-    collection_instance.instance_type = "COLLECTION"
-    collection_instance.instance_collection = source_collection
-    base_collection.objects.link(collection_instance)
-    if rotation_euler:
-        collection_instance.rotation_euler = rotation_euler
-    return collection_instance
+    if z_rotations is None:
+        z_rotations = [0.0] * len(locations)
+    collection_instances = []
+    for location, z_rotation in zip(locations, z_rotations):
+        collection_instance = bpy.data.objects.new(name=f"{collection_name}.instance.{str(location)}", object_data=None)
+        collection_instance.location = location
+        collection_instance.rotation_euler.z = z_rotation
+        collection_instance.instance_type = "COLLECTION"
+        collection_instance.instance_collection = source_collection
+        base_collection.objects.link(collection_instance)
+        collection_instances.append(collection_instance)
+    return collection_instances
 
 class Axis:
     X = 0
@@ -290,10 +250,7 @@ def set_scene_props(fps, loop_seconds):
     scene.render.fps = fps
     scene.frame_current = 1
     scene.frame_start = 1
-    scene.render.engine = "CYCLES"
-    scene.cycles.device = "GPU"
-    # scene.cycles.device = "CPU"
-    scene.cycles.samples = 300
+    apply_render_profile(scene, samples=300)
     scene.view_settings.look = "Very High Contrast"
     set_1080px_square_render_res()
 
@@ -305,20 +262,19 @@ def scene_setup(i=0):
     bpy.context.scene.render.image_settings.file_format = "FFMPEG"
     bpy.context.scene.render.ffmpeg.format = "MPEG4"
     bpy.context.scene.render.filepath = f"/tmp/project_{project_name}/loop_{i}.mp4"
-    seed = 0
+    seed = get_requested_seed()
     if seed:
         random.seed(seed)
     else:
-        time_seed()
-    use_clean_scene_experimental = False
-    if use_clean_scene_experimental:
-        clean_scene_experimental()
-    else:
-        clean_scene()
+        seed = time_seed()
+    clean_scene_fast()
     set_scene_props(fps, loop_seconds)
     context = {
         "frame_count": frame_count,
         "frame_count_loop": frame_count + 1,
+        "fps": fps,
+        "loop_seconds": loop_seconds,
+        "seed": seed,
     }
     return context
 
@@ -383,24 +339,100 @@ def create_truchet_tile_platform(context, truchet_tile_size):
     truchet_tile.parent = ctrl_empty
     return collection_name
 
+def get_truchet_tile_grid_locations(step_x, step_y, x_range, y_range):
+    return [(step_x * (x + 1), step_y * (y + 1), 0) for x in range(x_range) for y in range(y_range)]
+
+def get_random_truchet_tile_rotations(count):
+    return [math.radians(random.choice([0, 90])) for _ in range(count)]
+
 def create_truchet_tile_platform_group(step_x, step_y, x_range, y_range, base_truchet_tile_collection):
-    current_x = step_x
-    start_y = step_y
     platform_group_collection_name = "truchet_tiles_group"
-    create_collection(collection_name=platform_group_collection_name)
-    for _ in range(x_range):
-        current_y = start_y
-        for _ in range(y_range):
-            loc = (current_x, current_y, 0)
-            new_collection_obj = make_instance_of_collection(base_truchet_tile_collection, loc)
-            make_active(new_collection_obj)
-            add_to_collection(platform_group_collection_name)
-            current_deg_rot = random.choice([0, 90])
-            new_collection_obj.rotation_euler.z = math.radians(current_deg_rot)
-            current_y += step_y
-        current_x += step_x
+    platform_group_collection = create_collection(collection_name=platform_group_collection_name)
+    locations = get_truchet_tile_grid_locations(step_x, step_y, x_range, y_range)
+    z_rotations = get_random_truchet_tile_rotations(len(locations))
+    make_instances_of_collection(base_truchet_tile_collection, locations, z_rotations, base_collection=platform_group_collection)
     return platform_group_collection_name
 
+class TruchetSectionStreamer:
+    def __init__(self, base_truchet_tile_collection, step, tile_range, camera, camera_ctrl_empty, seed, pool_size=3, frame_window=30):
+        self.base_truchet_tile_collection = base_truchet_tile_collection
+        self.step = step
+        self.tile_range = tile_range
+        self.section_step = step * tile_range
+        self.camera = camera
+        self.camera_ctrl_empty = camera_ctrl_empty
+        self.seed = seed
+        self.frame_window = frame_window
+        self.locations = get_truchet_tile_grid_locations(step, step, tile_range, tile_range)
+        self.collection = create_collection(collection_name="truchet_tiles_stream")
+        self.slots = [self.create_slot(i) for i in range(pool_size)]
+        self.slot_sections = [None] * pool_size
+        self.min_x_offset, self.max_x_offset = self.get_ground_x_extent()
+
+    def create_slot(self, i):
+        slot_ctrl = bpy.data.objects.new(name=f"truchet_section.slot.{i}", object_data=None)
+        slot_ctrl.hide_viewport = True
+        slot_ctrl.hide_render = True
+        self.collection.objects.link(slot_ctrl)
+        tiles = make_instances_of_collection(self.base_truchet_tile_collection, self.locations, base_collection=self.collection)
+        for tile in tiles:
+            tile.parent = slot_ctrl
+        return slot_ctrl, tiles
+
+    def get_section_rotations(self, section_index):
+        section_random = random.Random(f"{self.seed}.{section_index}")
+        return [math.radians(section_random.choice([0, 90])) for _ in self.locations]
+
+    def get_ground_x_extent(self):
+        bpy.context.view_layer.update()
+        scene = bpy.context.scene
+        camera_matrix = self.camera.matrix_world
+        camera_location = camera_matrix.translation
+        ground_xs = []
+        for corner in self.camera.data.view_frame(scene=scene):
+            direction = (camera_matrix @ corner) - camera_location
+            if direction.z < 0:
+                ground_xs.append(camera_location.x + direction.x * (-camera_location.z / direction.z))
+            else:
+                ground_xs.append(camera_location.x + direction.normalized().x * self.camera.data.clip_end)
+        ctrl_x = self.camera_ctrl_empty.matrix_world.translation.x
+        return min(ground_xs) - ctrl_x, max(ground_xs) - ctrl_x
+
+    def get_camera_ctrl_x(self, frame):
+        animation_data = self.camera_ctrl_empty.animation_data
+        fcurve = animation_data.action.fcurves.find("location", index=Axis.X) if animation_data and animation_data.action else None
+        if fcurve is None:
+            return self.camera_ctrl_empty.location.x
+        return fcurve.evaluate(frame)
+
+    def get_visible_sections(self, frame):
+        start_x = self.get_camera_ctrl_x(frame)
+        end_x = self.get_camera_ctrl_x(frame + self.frame_window)
+        min_x = min(start_x, end_x) + self.min_x_offset - self.step / 2
+        max_x = max(start_x, end_x) + self.max_x_offset - self.step / 2
+        return range(math.floor(min_x / self.section_step), math.floor(max_x / self.section_step) + 1)
+
+    def place_section(self, slot_index, section_index):
+        slot_ctrl, tiles = self.slots[slot_index]
+        slot_ctrl.location.x = self.section_step * section_index
+        for tile, z_rotation in zip(tiles, self.get_section_rotations(section_index)):
+            tile.rotation_euler.z = z_rotation
+        self.slot_sections[slot_index] = section_index
+
+    def update(self, scene, depsgraph=None):
+        visible_sections = self.get_visible_sections(scene.frame_current)
+        missing_sections = [section for section in visible_sections if section not in self.slot_sections]
+        free_slots = [i for i, section in enumerate(self.slot_sections) if section not in visible_sections]
+        if len(missing_sections) > len(free_slots):
+            logging.warning("%d sections are visible but the pool only has %d slots", len(visible_sections), len(self.slots))
+        for slot_index, section_index in zip(free_slots, missing_sections):
+            self.place_section(slot_index, section_index)
+
+    def register(self):
+        bpy.context.scene.render.use_lock_interface = True
+        register_frame_change_handler("truchet_tiles.section_streamer", self.update)
+        self.update(bpy.context.scene)
+
 def animate_camera(context, section_step, camera_ctrl_empty):
     frame = 1
     camera_ctrl_empty.keyframe_insert("location", index=Axis.X, frame=frame)
@@ -416,6 +448,7 @@ def create_and_animate_camera(context, section_step):
     camera.location.y = -section_step / 2 + section_step / 10
     camera.location.z = section_step / 2
     animate_camera(context, section_step, camera_ctrl_empty)
+    return camera, camera_ctrl_empty
 
 def create_centerpiece(context):
     truchet_tile_size = 2
@@ -424,6 +457,12 @@ def create_centerpiece(context):
     step_y = truchet_tile_size
     x_range = 12
     y_range = 12
+    if context["use_streaming"]:
+        section_step = step_x * x_range
+        camera, camera_ctrl_empty = create_and_animate_camera(context, section_step)
+        streamer = TruchetSectionStreamer(base_truchet_tile_collection, step_x, x_range, camera, camera_ctrl_empty, context["seed"])
+        streamer.register()
+        return
     platform_group_collection_name = create_truchet_tile_platform_group(step_x, step_y, x_range, y_range, base_truchet_tile_collection)
     section_instance_count = 3
     section_step = step_x * x_range
@@ -433,13 +472,25 @@ def create_centerpiece(context):
     create_and_animate_camera(context, section_step)
 
 def main():
-    configure_logging()
-    enable_extra_curves()
-    context = scene_setup()
-    context["first_color"], context["second_color"] = select_color_pair()
-    create_centerpiece(context)
-    sun_config = {"sun_rotation": math.radians(random.uniform(0, 360))}
-    set_up_world_sun_light(sun_config, strength=0.1)
+    with profile_operators(globals()):
+        configure_logging()
+        enable_extra_curves()
+        context = scene_setup()
+        context["first_color"], context["second_color"] = select_color_pair()
+        # TRUCHET_STREAMING=1 swaps tile sections in around the camera instead of instancing every section up front
+        context["use_streaming"] = os.environ.get("TRUCHET_STREAMING") == "1"
+        # a reopened scene has no frame change handler, streamed tiles would stay frozen
+        use_scene_cache = not context["use_streaming"]
+        if use_scene_cache:
+            palette = [context["first_color"], context["second_color"]]
+            manifest = build_scene_manifest(__file__, context["seed"], context["fps"], context["loop_seconds"], palette)
+            if load_cached_scene(manifest):
+                return
+        create_centerpiece(context)
+        sun_config = {"sun_rotation": math.radians(random.uniform(0, 360))}
+        set_up_world_sun_light(sun_config, strength=0.1)
+        if use_scene_cache:
+            save_cached_scene(manifest)
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,13 @@
 import random
 import time
 import bpy
-import addon_utils
+import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from primitives import add_object, build_plane_geometry, get_shared_mesh, set_object_material
+from videomosaic import get_grid_shape, get_video_paths, run_mosaic_process
 
 def purge_orphans():
     if bpy.app.version >= (3, 0, 0):
@@ -39,7 +45,9 @@ def time_seed():
     seed = time.time()
     print(f"seed: {seed}")
     random.seed(seed)
-    bpy.context.window_manager.clipboard = str(seed)
+    bpy.context.scene["seed"] = seed
+    if not bpy.app.background:
+        bpy.context.window_manager.clipboard = str(seed)
     return seed
 
 def add_ctrl_empty(name=None):
@@ -112,11 +120,6 @@ def setup_scene():
     rot = (0, 0, 0)
     setup_camera(loc, rot)
 
-def enable_import_images_as_planes():
-    loaded_default, loaded_state = addon_utils.check("io_import_images_as_planes")
-    if not loaded_state:
-        addon_utils.enable("io_import_images_as_planes")
-
 def add_light():
     bpy.ops.object.light_add(type="SUN")
     sun = active_object()
@@ -124,59 +127,108 @@ def add_light():
     sun.data.specular_factor = 0
     sun.data.use_shadow = False
 
-def get_list_of_loops():
-    return [
-        "c:\\tmp\\project_cube_loops\\loop_0.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_1.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_10.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_11.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_12.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_13.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_14.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_15.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_2.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_3.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_4.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_5.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_6.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_7.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_8.mp4",
-        "c:\\tmp\\project_cube_loops\\loop_9.mp4",
-    ]
-
-def get_grid_step(path):
-    bpy.ops.import_image.to_plane(files=[{"name": path}])
-    plane = active_object()
-    x_step = plane.dimensions.x
-    y_step = plane.dimensions.y
-    bpy.ops.object.delete()
-    return x_step, y_step
+def get_list_of_loops(loop_dir="/tmp/project_cube_loops"):
+    # cubeloop_batch.py writes each loop into its own variation_<i> folder
+    video_paths = get_video_paths(loop_dir)
+    if not video_paths:
+        raise FileNotFoundError(f"no video loops found under {loop_dir}")
+    return video_paths
+
+def load_video(path):
+    # size and frame count come from the movie metadata, no plane or material is created
+    return bpy.data.images.load(path, check_existing=True)
+
+def get_grid_step(image):
+    width, height = image.size
+    return width / height, 1.0
+
+def get_unit_plane_mesh():
+    mesh = get_shared_mesh("videogrid.unit_plane", lambda: build_plane_geometry(1.0))
+    if not mesh.uv_layers:
+        uv_layer = mesh.uv_layers.new(name="UVMap")
+        uv_layer.data.foreach_set("uv", np.array([(0, 0), (1, 0), (1, 1), (0, 1)], dtype=np.float32).ravel())
+    return mesh
+
+def create_video_material_template():
+    material = bpy.data.materials.new(name="videogrid.template")
+    material.use_nodes = True
+    nodes = material.node_tree.nodes
+    principled_bsdf_node = nodes["Principled BSDF"]
+    principled_bsdf_node.inputs["Roughness"].default_value = 0.0
+    image_texture_node = nodes.new(type="ShaderNodeTexImage")
+    image_texture_node.name = "Image Texture"
+    image_texture_node.location = (principled_bsdf_node.location.x - 400, principled_bsdf_node.location.y)
+    material.node_tree.links.new(image_texture_node.outputs["Color"], principled_bsdf_node.inputs["Base Color"])
+    return material
+
+def create_video_material(template, image, frame_duration=None):
+    # a material can only sample one image per node for every object using it, so each clip needs its own copy
+    material = template.copy()
+    material.name = f"videogrid.{image.name}"
+    image_texture_node = material.node_tree.nodes["Image Texture"]
+    image_texture_node.image = image
+    image_user = image_texture_node.image_user
+    image_user.frame_duration = frame_duration or image.frame_duration
+    image_user.use_auto_refresh = True
+    image_user.use_cyclic = True
+    return material
+
+def frame_grid(column_count, row_count, x_step, y_step):
+    # pull the camera back so larger walls stay in frame, 16 clips keep the original distance
+    grid_extent = max(column_count * x_step, row_count * y_step, 4)
+    bpy.context.scene.camera.location.z = 5 * grid_extent / 4
+
+def gen_mosaic_centerpiece(max_mosaic_width=4096):
+    list_of_video_paths = get_list_of_loops()
+    random.shuffle(list_of_video_paths)
+    first_video = load_video(list_of_video_paths[0])
+    x_step, y_step = get_grid_step(first_video)
+    bpy.data.images.remove(first_video)
+    column_count, row_count = get_grid_shape(len(list_of_video_paths))
+    tile_width = min(256, max_mosaic_width // column_count)
+    tile_height = round(tile_width * y_step / x_step)
+    scene = bpy.context.scene
+    first_frame_path, column_count, row_count = run_mosaic_process(
+        list_of_video_paths,
+        "/tmp/project_loop_grid_mosaic",
+        scene.frame_end,
+        scene.render.fps,
+        tile_width,
+        tile_height,
+        column_count,
+    )
+    mosaic = bpy.data.images.load(first_frame_path, check_existing=True)
+    mosaic.source = "SEQUENCE"
+    obj = add_object("videogrid.mosaic", get_unit_plane_mesh())
+    obj.scale = (column_count * x_step, row_count * y_step, 1)
+    set_object_material(obj, create_video_material(create_video_material_template(), mosaic, scene.frame_end))
+    frame_grid(column_count, row_count, x_step, y_step)
 
 def gen_centerpiece():
     list_of_video_paths = get_list_of_loops()
     random.shuffle(list_of_video_paths)
-    x_step, y_step = get_grid_step(list_of_video_paths[0])
-    start_x = -1.5
-    stop_x = 2
-    current_x = start_x
-    current_y = -1.5
-    for mp4_path in list_of_video_paths:
-        bpy.ops.import_image.to_plane(files=[{"name": mp4_path}])
-        obj = active_object()
-        obj.location.x = current_x
-        obj.location.y = current_y
-        shader_nodes = obj.active_material.node_tree.nodes
-        shader_nodes["Principled BSDF"].inputs["Roughness"].default_value = 0.0
-        shader_nodes["Image Texture"].image_user.use_cyclic = True
-        current_x += x_step
-        if current_x > stop_x:
-            current_x = start_x
-            current_y += y_step
+    videos = [load_video(path) for path in list_of_video_paths]
+    x_step, y_step = get_grid_step(videos[0])
+    column_count, row_count = get_grid_shape(len(videos))
+    start_x = -(column_count - 1) * x_step / 2
+    start_y = -(row_count - 1) * y_step / 2
+    mesh = get_unit_plane_mesh()
+    template = create_video_material_template()
+    for i, video in enumerate(videos):
+        width, height = video.size
+        location = (start_x + (i % column_count) * x_step, start_y + (i // column_count) * y_step, 0)
+        obj = add_object(video.name, mesh, location)
+        obj.scale.x = width / height
+        set_object_material(obj, create_video_material(template, video))
+    frame_grid(column_count, row_count, x_step, y_step)
 
 def main():
     setup_scene()
-    enable_import_images_as_planes()
-    gen_centerpiece()
+    # VIDEO_MOSAIC=1 pre-composites every clip into one image sequence on a single plane
+    if os.environ.get("VIDEO_MOSAIC") == "1":
+        gen_mosaic_centerpiece()
+    else:
+        gen_centerpiece()
     add_light()
 
 if __name__ == "__main__":
@@ -0,0 +1,197 @@
+import argparse
+import hashlib
+import math
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# python videomosaic.py /tmp/project_loop_grid_mosaic --loop-dir /tmp/project_cube_loops --frames 360
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm")
+MOSAIC_FRAME_PATTERN = "mosaic_%04d.png"
+
+worker_tiles = None
+
+
+def get_ffmpeg():
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("the mosaic pipeline needs ffmpeg on PATH to decode and write frames")
+    return ffmpeg
+
+
+def get_grid_shape(clip_count, columns=None):
+    if columns is None:
+        columns = math.ceil(math.sqrt(clip_count))
+    return columns, math.ceil(clip_count / columns)
+
+
+def decode_clip(path, raw_path, tile_width, tile_height):
+    # decoded tiles are kept next to the mosaic so re-runs with the same tile size skip decoding
+    if os.path.exists(raw_path):
+        return raw_path
+    partial_path = f"{raw_path}.partial"
+    subprocess.run(
+        [
+            get_ffmpeg(),
+            "-v",
+            "error",
+            "-i",
+            path,
+            "-vf",
+            f"scale={tile_width}:{tile_height}",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgb24",
+            "-y",
+            partial_path,
+        ],
+        check=True,
+    )
+    os.replace(partial_path, raw_path)
+    return raw_path
+
+
+def get_tile_path(output_dir, video_path, tile_width, tile_height):
+    # keyed on the clip itself so shuffled or replaced clips never reuse another clip's tiles
+    stat = os.stat(video_path)
+    clip_key = f"{os.path.abspath(video_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    clip_hash = hashlib.sha1(clip_key.encode("utf-8")).hexdigest()
+    return os.path.join(output_dir, f"tile_{clip_hash}_{tile_width}x{tile_height}.rgb")
+
+
+def open_tiles(raw_paths, tile_width, tile_height):
+    tiles = []
+    for raw_path in raw_paths:
+        frames = np.memmap(raw_path, dtype=np.uint8, mode="r")
+        tiles.append(frames.reshape(-1, tile_height, tile_width, 3))
+    return tiles
+
+
+def init_compose_worker(raw_paths, tile_width, tile_height):
+    global worker_tiles
+    worker_tiles = open_tiles(raw_paths, tile_width, tile_height)
+
+
+def compose_frame(frame, columns, rows, tile_width, tile_height):
+    mosaic = np.zeros((rows, columns, tile_height, tile_width, 3), dtype=np.uint8)
+    for i, frames in enumerate(worker_tiles):
+        # first clip in the bottom left like the plane grid, image rows run top to bottom
+        mosaic[rows - 1 - i // columns, i % columns] = frames[frame % len(frames)]
+    return mosaic.transpose(0, 2, 1, 3, 4).reshape(rows * tile_height, columns * tile_width, 3).tobytes()
+
+
+def build_mosaic(video_paths, output_dir, frame_count, fps=30, tile_width=256, tile_height=256, columns=None, workers=None):
+    os.makedirs(output_dir, exist_ok=True)
+    columns, rows = get_grid_shape(len(video_paths), columns)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    raw_paths = [get_tile_path(output_dir, video_path, tile_width, tile_height) for video_path in video_paths]
+    mp_context = multiprocessing.get_context("spawn")
+
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+        list(executor.map(decode_clip, video_paths, raw_paths, [tile_width] * len(video_paths), [tile_height] * len(video_paths)))
+    print(f"decoded {len(video_paths)} clips in {time.perf_counter() - start_time:.2f}s")
+
+    start_time = time.perf_counter()
+    encoder = subprocess.Popen(
+        [
+            get_ffmpeg(),
+            "-v",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgb24",
+            "-s",
+            f"{columns * tile_width}x{rows * tile_height}",
+            "-r",
+            str(fps),
+            "-i",
+            "-",
+            "-y",
+            os.path.join(output_dir, MOSAIC_FRAME_PATTERN),
+        ],
+        stdin=subprocess.PIPE,
+    )
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context,
+        initializer=init_compose_worker,
+        initargs=(raw_paths, tile_width, tile_height),
+    ) as executor:
+        frames = range(frame_count)
+        grid = [columns] * frame_count, [rows] * frame_count, [tile_width] * frame_count, [tile_height] * frame_count
+        for frame_bytes in executor.map(compose_frame, frames, *grid, chunksize=8):
+            encoder.stdin.write(frame_bytes)
+    encoder.stdin.close()
+    if encoder.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed writing the mosaic to {output_dir}")
+    print(f"composed {frame_count} mosaic frames in {time.perf_counter() - start_time:.2f}s")
+    return os.path.join(output_dir, MOSAIC_FRAME_PATTERN % 1), columns, rows
+
+
+def run_mosaic_process(video_paths, output_dir, frame_count, fps=30, tile_width=256, tile_height=256, columns=None, workers=None):
+    # Blender registers the running script as __main__, spawned pool workers would re-import it without bpy,
+    # so callers inside Blender build the mosaic in a separate interpreter
+    command = [
+        sys.executable,
+        os.path.abspath(__file__),
+        output_dir,
+        "--frames",
+        str(frame_count),
+        "--fps",
+        str(fps),
+        "--tile-width",
+        str(tile_width),
+        "--tile-height",
+        str(tile_height),
+        "--videos",
+        *video_paths,
+    ]
+    if columns is not None:
+        command += ["--columns", str(columns)]
+    if workers is not None:
+        command += ["--workers", str(workers)]
+    subprocess.run(command, check=True)
+    columns, rows = get_grid_shape(len(video_paths), columns)
+    return os.path.join(output_dir, MOSAIC_FRAME_PATTERN % 1), columns, rows
+
+
+def get_video_paths(loop_dir):
+    video_paths = []
+    for dir_path, _, file_names in os.walk(loop_dir):
+        video_paths.extend(os.path.join(dir_path, name) for name in file_names if name.lower().endswith(VIDEO_EXTENSIONS))
+    return sorted(video_paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tile video loops into one mosaic image sequence")
+    parser.add_argument("output_dir")
+    parser.add_argument("--loop-dir", help="tile every video found under this folder")
+    parser.add_argument("--videos", nargs="+", help="tile these videos in this order")
+    parser.add_argument("--frames", type=int, default=360)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--tile-width", type=int, default=256)
+    parser.add_argument("--tile-height", type=int, default=256)
+    parser.add_argument("--columns", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    video_paths = args.videos or (get_video_paths(args.loop_dir) if args.loop_dir else [])
+    if not video_paths:
+        parser.error("no videos given, pass --videos or a --loop-dir containing video files")
+    first_frame_path, columns, rows = build_mosaic(
+        video_paths, args.output_dir, args.frames, args.fps, args.tile_width, args.tile_height, args.columns, args.workers
+    )
+    print(f"{columns}x{rows} mosaic written starting at {first_frame_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
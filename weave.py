@@ -4,6 +4,14 @@ import math
 import bpy
 import mathutils
 import addon_utils
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from meshcache import cached_object
+from renderutils import render_loop
+from opprofiler import profile_operators
+from renderprofiles import apply_render_profile
 
 def purge_orphans():
     if bpy.app.version >= (3, 0, 0):
@@ -39,7 +47,9 @@ def time_seed():
     seed = time.time()
     print(f"seed: {seed}")
     random.seed(seed)
-    bpy.context.window_manager.clipboard = str(seed)
+    bpy.context.scene["seed"] = seed
+    if not bpy.app.background:
+        bpy.context.window_manager.clipboard = str(seed)
     return seed
 
 def add_ctrl_empty(name=None):
@@ -115,9 +125,7 @@ def set_scene_props(fps, loop_seconds):
     set_1080px_square_render_res()
     cycles = False
     if cycles:
-        bpy.context.scene.render.engine = "CYCLES"
-        bpy.context.scene.cycles.device = "GPU"
-        bpy.context.scene.cycles.samples = 1024
+        apply_render_profile(scene, samples=1024)
 
 def setup_scene(i=0):
     fps = 30
@@ -179,9 +187,6 @@ def get_random_color():
         ]
     )
 
-def render_loop():
-    bpy.ops.render.render(animation=True)
-
 def enable_extra_curves():
     loaded_default, loaded_state = addon_utils.check("add_curve_extra_objects")
     if not loaded_state:
@@ -217,17 +222,21 @@ def create_profile_curve():
     profile_curve.scale *= 0.1
     return profile_curve
 
-def create_base_curve():
+def add_torus_spiral(turns=15, steps=64, cycles=1, curves_number=4):
     bpy.ops.curve.spirals(
         spiral_type='TORUS', 
-        turns=15, 
-        steps=64, 
-        cycles=1, 
-        curves_number=4, 
+        turns=turns, 
+        steps=steps, 
+        cycles=cycles, 
+        curves_number=curves_number, 
         use_cyclic_u=True, 
         edit_mode=False)
     return active_object()
 
+def create_base_curve():
+    params = {"turns": 15, "steps": 64, "cycles": 1, "curves_number": 4}
+    return cached_object("torus_spiral", add_torus_spiral, params)
+
 def animate_point_tilt(obj, frame_count):
     points = obj.data.splines.active.points
     for pnt in points:
@@ -258,10 +267,11 @@ def create_centerpiece(context):
     create_emissive_curve()
 
 def main():
-    context = setup_scene()
-    add_lights()
-    enable_extra_curves()
-    create_centerpiece(context)
+    with profile_operators(globals()):
+        context = setup_scene()
+        add_lights()
+        enable_extra_curves()
+        create_centerpiece(context)
 
 if __name__ == "__main__":
     main()